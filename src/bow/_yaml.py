@@ -0,0 +1,16 @@
+"""
+bow._yaml — PyYAML safe loader/dumper selection.
+
+The libyaml-backed (C) classes when PyYAML was built with them, else
+the pure-Python ones. Every module that parses or emits YAML imports
+them from here.
+"""
+
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+    HAS_LIBYAML = True
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+    HAS_LIBYAML = False
+
+__all__ = ["SafeDumper", "SafeLoader", "HAS_LIBYAML"]
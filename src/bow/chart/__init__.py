@@ -2,13 +2,14 @@
 
 from bow.chart.base import Chart
 from bow.chart.dependency import ChartDep
-from bow.chart.registry import register_chart, get_chart, list_charts
+from bow.chart.registry import register_chart, register_charts, get_chart, list_charts
 from bow.chart.values import deep_merge, merge_all_values
 
 __all__ = [
     "Chart",
     "ChartDep",
     "register_chart",
+    "register_charts",
     "get_chart",
     "list_charts",
     "deep_merge",
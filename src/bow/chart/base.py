@@ -14,6 +14,7 @@ from typing import Any, ClassVar
 
 import yaml
 
+from bow._yaml import SafeLoader as _SafeLoader
 from bow.chart.dependency import ChartDep, resolve_condition, get_dep_values
 from bow.chart.values import deep_merge, merge_all_values
 from bow.core.manifest import manifest, Manifest
@@ -84,8 +85,8 @@ class Chart:
             if hasattr(mod, "__file__") and mod.__file__:
                 defaults_path = Path(mod.__file__).parent / "defaults.yaml"
                 if defaults_path.exists():
-                    with open(defaults_path) as f:
-                        data = yaml.safe_load(f)
+                    with open(defaults_path, "rb") as f:
+                        data = yaml.load(f, Loader=_SafeLoader)
                     return data if isinstance(data, dict) else {}
         return {}
 
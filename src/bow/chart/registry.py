@@ -22,7 +22,7 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable
 
 if TYPE_CHECKING:
     from bow.chart.base import Chart
@@ -87,6 +87,11 @@ def register_chart(chart_cls: type[Chart]) -> None:
     _registry[chart_cls.name] = chart_cls
 
 
+def register_charts(chart_classes: Iterable[type[Chart]]) -> None:
+    """Register several chart classes with one registry update."""
+    _registry.update({cls.name: cls for cls in chart_classes})
+
+
 def get_chart(name: str) -> Chart | None:
     """Create an instance from a chart name."""
     _discover_charts()
@@ -3,6 +3,7 @@ bow.cli.pull_cmd — bow pull command.
 
   bow pull postgresql:16.4.0
   bow pull oci://ghcr.io/charts/postgresql:16.4.0
+  bow pull postgresql:16.4.0 redis:7.2.0
 """
 
 import sys
@@ -10,9 +11,13 @@ import click
 
 
 @click.command("pull")
-@click.argument("reference")
-def pull_cmd(reference):
-    """Pull a chart from OCI registry and install into the active env."""
+@click.argument("references", nargs=-1, required=True)
+def pull_cmd(references):
+    """Pull charts from OCI registry and install into the active env.
+
+    Several references are pulled first, then installed with a
+    single pip invocation.
+    """
     from bow.oci.config import load_config
     from bow.oci.client import pull_chart, unpack_chart, OCIError
     from bow.oci.env import get_env, pip_install_in_env, EnvError
@@ -20,33 +25,37 @@ def pull_cmd(reference):
     cfg = load_config()
 
     # Parse reference: name:version or oci://reg/name:version
-    name, version, registry_url = _parse_reference(reference, cfg)
+    parsed = [_parse_reference(ref, cfg) for ref in references]
 
     # Pull
     try:
         env = get_env()
-        click.echo(f"Pulling {name}:{version} from {registry_url}...", err=True)
         click.echo(f"Environment: {env.name}", err=True)
 
-        artifact = pull_chart(name, version, registry_url, env.cache_path)
-        click.echo(f"Digest: {artifact.digest}", err=True)
+        extract_dirs = []
+        for name, version, registry_url in parsed:
+            click.echo(f"Pulling {name}:{version} from {registry_url}...", err=True)
+            artifact = pull_chart(name, version, registry_url, env.cache_path)
+            click.echo(f"Digest: {artifact.digest}", err=True)
+
+            if not artifact.tar_path:
+                click.echo("Error: No artifact to install.", err=True)
+                sys.exit(1)
 
-        # Unpack + pip install
-        if artifact.tar_path:
+            # Unpack
             import tempfile
             extract_dir = tempfile.mkdtemp()
             unpack_chart(artifact.tar_path, extract_dir)
+            extract_dirs.append(extract_dir)
 
-            # pip install
-            result = pip_install_in_env(extract_dir, env)
-            if result.returncode != 0:
-                click.echo(f"pip install failed:\n{result.stderr}", err=True)
-                sys.exit(1)
+        # pip install (all charts at once)
+        result = pip_install_in_env(extract_dirs, env)
+        if result.returncode != 0:
+            click.echo(f"pip install failed:\n{result.stderr}", err=True)
+            sys.exit(1)
 
+        for name, version, _ in parsed:
             click.echo(f"✓ {name}:{version} installed in env '{env.name}'", err=True)
-        else:
-            click.echo("Error: No artifact to install.", err=True)
-            sys.exit(1)
 
     except OCIError as e:
         click.echo(f"Error: {e}", err=True)
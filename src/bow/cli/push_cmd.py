@@ -4,6 +4,7 @@ bow.cli.push_cmd — bow push command.
   bow push . --tag 16.4.0
   bow push ./charts/bow-postgresql
   bow push . --registry oci://ghcr.io/getbow/charts
+  bow push . --compression zstd
 """
 
 import sys
@@ -14,7 +15,10 @@ import click
 @click.argument("chart_dir", default=".")
 @click.option("--tag", "-t", default=None, help="Version tag override")
 @click.option("--registry", "-r", default=None, help="Registry URL override")
-def push_cmd(chart_dir, tag, registry):
+@click.option("--compression", type=click.Choice(["gzip", "zstd"]),
+              default="gzip", show_default=True,
+              help="Chart layer compression (zstd requires zstandard)")
+def push_cmd(chart_dir, tag, registry, compression):
     """Push a chart to an OCI registry."""
     from bow.oci.config import load_config
     from bow.oci.client import pack_chart, push_chart, OCIError
@@ -28,7 +32,7 @@ def push_cmd(chart_dir, tag, registry):
     # Package
     try:
         click.echo(f"Packing chart from {chart_dir}...", err=True)
-        artifact = pack_chart(chart_dir)
+        artifact = pack_chart(chart_dir, compression=compression)
 
         if tag:
             artifact.version = tag
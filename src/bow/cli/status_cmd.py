@@ -7,7 +7,7 @@ Shows workspace status: lock info, stage, drift.
 import sys
 import click
 
-from bow.workspace.lock import parse_lock, check_drift, compute_checksum, LockError
+from bow.workspace.lock import parse_lock, drift_checksum, LockError
 from bow.workspace.stage import resolve_stages
 
 
@@ -60,9 +60,9 @@ def status_cmd(stages, workspace_dir):
     # Drift check
     click.echo()
     if lock.checksum:
-        has_drift = check_drift(ws, lock)
-        current = compute_checksum(ws)
-        if has_drift:
+        # Hashes only when the stat sidecar can't vouch for the lock
+        current = drift_checksum(ws, lock)
+        if current is not None:
             click.echo(f"⚠ DRIFT DETECTED")
             click.echo(f"  locked:  {lock.checksum}")
             click.echo(f"  current: {current}")
@@ -13,9 +13,21 @@ from typing import Any
 
 import yaml
 
+from bow._yaml import SafeDumper as _SafeDumper
 from bow.core.stack import _collected, _set_collected, _reset
 
 
+class _BowDumper(_SafeDumper):
+    """Manifest dumper, configured once at import.
+
+    Shared dicts (e.g. selector/template labels) are written out in full
+    rather than as &anchor/*alias pairs, as kubectl users expect.
+    """
+
+    def ignore_aliases(self, data: Any) -> bool:
+        return True
+
+
 class Manifest:
     """Converts collected resources to YAML."""
 
@@ -37,18 +49,26 @@ class Manifest:
 
     def to_yaml(self) -> str:
         """Produce a multi-document YAML string."""
-        docs = self.to_dicts()
-        if not docs:
-            return ""
-        parts: list[str] = []
-        for doc in docs:
-            parts.append(yaml.dump(
-                doc,
-                default_flow_style=False,
-                sort_keys=False,
-                allow_unicode=True,
-            ))
-        return "---\n".join(parts)
+        return _dump_docs(self.to_dicts())
+
+
+def _dump_docs(docs: list[dict[str, Any]]) -> str:
+    """Serialize already-rendered documents as multi-document YAML.
+
+    Lets callers that hold to_dicts() output get the to_yaml() text
+    without walking the resource tree a second time.
+    """
+    if not docs:
+        return ""
+    # One emitter for the whole stream; output matches per-doc dumps
+    # joined with "---" (no leading document marker).
+    return yaml.dump_all(
+        docs,
+        Dumper=_BowDumper,
+        default_flow_style=False,
+        sort_keys=False,
+        allow_unicode=True,
+    )
 
 
 @contextmanager
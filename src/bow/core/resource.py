@@ -10,26 +10,37 @@ Common behaviors for all Kubernetes resources:
 
 from __future__ import annotations
 
+from contextvars import ContextVar
 from typing import Any
 
 from bow.core.stack import _current, _push, _pop, _collected
 
 
-# Bow tracking labels
-_TRACKING_LABELS: dict[str, str] = {}
+# Bow tracking labels (context-local, like the resource stack in bow.core.stack)
+_tracking: ContextVar[dict[str, str] | None] = ContextVar("bow_tracking", default=None)
+
+
+def _tracking_labels() -> dict[str, str]:
+    """Return the current context's tracking labels."""
+    return _tracking.get() or {}
 
 
 def set_tracking(chart: str | None = None, version: str | None = None,
                  stack: str | None = None) -> None:
-    """Set global tracking labels. Called by the CLI."""
-    _TRACKING_LABELS.clear()
-    _TRACKING_LABELS["bow.io/managed-by"] = "bow"
+    """Set tracking labels for the current context. Called by the CLI."""
+    labels = {"bow.io/managed-by": "bow"}
     if chart:
-        _TRACKING_LABELS["bow.io/chart"] = chart
+        labels["bow.io/chart"] = chart
     if version:
-        _TRACKING_LABELS["bow.io/version"] = version
+        labels["bow.io/version"] = version
     if stack:
-        _TRACKING_LABELS["bow.io/stack"] = stack
+        labels["bow.io/stack"] = stack
+    _tracking.set(labels)
+
+
+def _reset_tracking() -> None:
+    """Clear the tracking labels. For testing."""
+    _tracking.set(None)
 
 
 class Resource:
@@ -53,7 +64,7 @@ class Resource:
 
         # Labels
         labels = dict(kwargs.pop("labels", {}) or {})
-        labels.update(_TRACKING_LABELS)
+        labels.update(_tracking_labels())
         if labels:
             self.metadata["labels"] = labels
 
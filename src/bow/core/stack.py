@@ -1,24 +1,30 @@
 """
-bow.core.stack — Thread-local resource stack.
+bow.core.stack — Context-local resource stack.
 
 Inspired by Tagflow's document context.
 Each `with Resource(...)` block pushes onto the stack,
 pops on exit. Leaf nodes find their parent via _current().
+
+State lives in ContextVars, so every thread (and every asyncio
+task) builds its own tree without a shared module-level list.
 """
 
 from __future__ import annotations
 
-import threading
+from contextvars import ContextVar
 from typing import Any
 
-_local = threading.local()
+_stack: ContextVar[list[Any] | None] = ContextVar("bow_stack", default=None)
+_collected_var: ContextVar[list[Any] | None] = ContextVar("bow_collected", default=None)
 
 
 def _current_stack() -> list[Any]:
     """Return the active resource stack."""
-    if not hasattr(_local, "stack"):
-        _local.stack = []
-    return _local.stack
+    stack = _stack.get()
+    if stack is None:
+        stack = []
+        _stack.set(stack)
+    return stack
 
 
 def _current() -> Any | None:
@@ -39,17 +45,19 @@ def _pop() -> Any:
 
 def _collected() -> list[Any]:
     """Top-level resources collected by the manifest."""
-    if not hasattr(_local, "collected"):
-        _local.collected = []
-    return _local.collected
+    collected = _collected_var.get()
+    if collected is None:
+        collected = []
+        _collected_var.set(collected)
+    return collected
 
 
 def _set_collected(lst: list[Any]) -> None:
     """Replace the collected list (manifest context switch)."""
-    _local.collected = lst
+    _collected_var.set(lst)
 
 
 def _reset() -> None:
     """Reset stack and collected. For testing."""
-    _local.stack = []
-    _local.collected = []
+    _stack.set([])
+    _collected_var.set([])
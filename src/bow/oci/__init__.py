@@ -1,7 +1,7 @@
 """bow.oci — OCI registry + environment management."""
 
 from bow.oci.config import (
-    BowConfig, RegistryConfig, load_config, save_config, BOW_HOME,
+    BowConfig, RegistryConfig, load_config, save_config, BOW_HOME, bow_home,
     DEFAULT_REGISTRY_URL, DEFAULT_REGISTRY_NAME,
 )
 from bow.oci.env import (
@@ -15,7 +15,7 @@ from bow.oci.client import (
 )
 
 __all__ = [
-    "BowConfig", "RegistryConfig", "load_config", "save_config", "BOW_HOME",
+    "BowConfig", "RegistryConfig", "load_config", "save_config", "BOW_HOME", "bow_home",
     "DEFAULT_REGISTRY_URL", "DEFAULT_REGISTRY_NAME",
     "EnvInfo", "EnvError",
     "create_env", "delete_env", "get_env", "use_env", "list_envs",
@@ -11,24 +11,44 @@ OCI artifact structure:
   manifest.json
     ├── config: application/vnd.bow.chart.config.v1+json
     └── layer[0]: application/vnd.bow.chart.content.v1.tar+gzip
+                  (or ...tar+zstd when packed with compression="zstd")
 """
 
 from __future__ import annotations
 
+import atexit
+import contextlib
+import functools
+import gzip
 import hashlib
+import importlib
 import json
 import os
 import shutil
+import stat
+import subprocess
 import tarfile
 import tempfile
-from dataclasses import dataclass
+import threading
+import uuid
+from dataclasses import dataclass, replace
 from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
 
 
 CHART_CONFIG_MEDIA_TYPE = "application/vnd.bow.chart.config.v1+json"
 CHART_CONTENT_MEDIA_TYPE = "application/vnd.bow.chart.content.v1.tar+gzip"
+CHART_CONTENT_MEDIA_TYPE_ZSTD = "application/vnd.bow.chart.content.v1.tar+zstd"
+
+# compression → (layer media type, file suffix)
+_COMPRESSIONS: dict[str, tuple[str, str]] = {
+    "gzip": (CHART_CONTENT_MEDIA_TYPE, ".tar.gz"),
+    "zstd": (CHART_CONTENT_MEDIA_TYPE_ZSTD, ".tar.zst"),
+}
+_SUFFIX_MEDIA_TYPES = {suffix: mt for mt, suffix in _COMPRESSIONS.values()}
+_MEDIA_TYPE_SUFFIXES = dict(_COMPRESSIONS.values())
+_ARTIFACT_SUFFIXES = tuple(_SUFFIX_MEDIA_TYPES)
 
 
 def _is_remote_registry(url: str) -> bool:
@@ -154,6 +174,7 @@ class ChartArtifact:
     registry: str = ""       # oci://...
     tar_path: Path | None = None
     config: dict[str, Any] | None = None
+    media_type: str = CHART_CONTENT_MEDIA_TYPE
 
 
 class OCIError(Exception):
@@ -163,7 +184,10 @@ class OCIError(Exception):
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # CHART PACKING
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-def pack_chart(chart_dir: str | Path) -> ChartArtifact:
+def pack_chart(
+    chart_dir: str | Path,
+    compression: str = "gzip",
+) -> ChartArtifact:
     """Package a chart directory as an OCI artifact.
 
     chart_dir structure (bow-postgresql/):
@@ -177,65 +201,232 @@ def pack_chart(chart_dir: str | Path) -> ChartArtifact:
         ├── __init__.py
         └── defaults.yaml
 
+    Args:
+        chart_dir: Chart directory
+        compression: "gzip" (default) or "zstd" (requires zstandard)
+
     Returns:
         ChartArtifact (tar_path is set)
     """
     chart_dir = Path(chart_dir)
 
+    if compression not in _COMPRESSIONS:
+        raise OCIError(
+            f"Unsupported compression: '{compression}'. "
+            f"Expected one of: {', '.join(_COMPRESSIONS)}"
+        )
+    media_type, suffix = _COMPRESSIONS[compression]
+
     # Find chart metadata
     config = _read_chart_config(chart_dir)
     name = config["name"]
     version = config["version"]
 
-    # Create tar.gz
-    tar_path = Path(tempfile.mkdtemp()) / f"{name}-{version}.tar.gz"
-
-    with tarfile.open(tar_path, "w:gz") as tar:
-        # chart.json (metadata)
-        config_bytes = json.dumps(config, indent=2).encode()
-        config_info = tarfile.TarInfo(name="chart.json")
-        config_info.size = len(config_bytes)
-        tar.addfile(config_info, BytesIO(config_bytes))
-
-        # Chart source files
-        src_dir = _find_chart_src(chart_dir, name)
-        if src_dir and src_dir.exists():
-            for fp in sorted(src_dir.rglob("*")):
-                if fp.is_file() and not fp.name.startswith(".") \
-                   and "__pycache__" not in str(fp):
-                    arcname = str(fp.relative_to(src_dir.parent))
-                    tar.add(str(fp), arcname=arcname)
-
-        # pyproject.toml (needed for pip install)
-        pyproject = chart_dir / "pyproject.toml"
-        if pyproject.exists():
-            tar.add(str(pyproject), arcname="pyproject.toml")
-
-        # Preserve src directory structure
-        src_root = chart_dir / "src"
-        if src_root.exists():
-            # Include files like src/__init__.py
-            for fp in sorted(src_root.rglob("*")):
-                if fp.is_file() and not fp.name.startswith(".") \
-                   and "__pycache__" not in str(fp):
-                    arcname = str(fp.relative_to(chart_dir))
-                    tar.add(str(fp), arcname=arcname)
-
-    # Compute digest
-    digest = _compute_file_digest(tar_path)
+    files = _collect_chart_files(chart_dir, name)
+    source_digest = _source_digest(config, files, compression)
 
-    return ChartArtifact(
+    # One scratch dir per source digest: a repack after an edit never
+    # overwrites the tarball an earlier ChartArtifact points at
+    tar_path = (
+        _work_dir(source_digest.removeprefix("sha256:"))
+        / f"{name}-{version}{suffix}"
+    )
+
+    # Unchanged sources since the last pack in this process: reuse it
+    packed = _packed.get(source_digest)
+    if packed and packed.tar_path == tar_path and tar_path.exists():
+        return replace(packed, config=dict(config))
+
+    # Fresh inode: a previous pack may be hardlinked into a registry/cache
+    tar_path.unlink(missing_ok=True)
+    _packed.pop(source_digest, None)
+
+    # Hash the compressed bytes as they are written; no second read pass
+    with open(tar_path, "wb") as raw:
+        out = _HashingWriter(raw)
+        if compression == "zstd":
+            zstd = _import_zstd()
+            cctx = zstd.ZstdCompressor(level=3, threads=-1)
+            writer = cctx.stream_writer(out, closefd=False)
+        else:
+            writer = _open_gzip_writer(out)
+        with writer as stream, tarfile.open(
+            fileobj=stream, mode="w|",
+            bufsize=_TAR_BUFSIZE, copybufsize=_TAR_BUFSIZE,
+        ) as tar:
+            _add_chart_files(tar, config, files)
+
+    artifact = ChartArtifact(
         name=name,
         version=version,
         description=config.get("description", ""),
-        digest=digest,
+        digest=out.digest,
         tar_path=tar_path,
         config=config,
+        media_type=media_type,
     )
+    _packed[source_digest] = replace(artifact)
+    return artifact
+
+
+# Artifacts packed by this process: source digest → artifact. Each one's
+# tar lives in the digest-named work dir, so no later pack can rewrite it.
+# A hit trusts _source_digest, which reads only small files' bytes.
+_packed: dict[str, ChartArtifact] = {}
+
+
+def _add_chart_files(
+    tar: tarfile.TarFile,
+    config: dict[str, Any],
+    files: dict[str, tuple[str, os.stat_result]],
+) -> None:
+    """Write chart.json and the chart sources into an open tar."""
+    # chart.json (metadata)
+    config_bytes = _compact_json(config)
+    config_info = tarfile.TarInfo(name="chart.json")
+    config_info.size = len(config_bytes)
+    tar.addfile(config_info, BytesIO(config_bytes))
+
+    for arcname, (fp, st) in files.items():
+        if not stat.S_ISREG(st.st_mode):
+            # Symlinks etc.: let tarfile work out the member type
+            tar.add(fp, arcname=arcname, recursive=False)
+            continue
+        # Regular files: reuse the walk's stat (no second lstat/pwd lookup)
+        with open(fp, "rb") as f:
+            tar.addfile(_file_tarinfo(arcname, st), f)
+
+
+def _file_tarinfo(arcname: str, st: os.stat_result) -> tarfile.TarInfo:
+    """Build a regular-file TarInfo from an existing stat result."""
+    info = tarfile.TarInfo(name=arcname)
+    info.size = st.st_size
+    info.mtime = st.st_mtime
+    info.mode = stat.S_IMODE(st.st_mode)
+    info.uid = st.st_uid
+    info.gid = st.st_gid
+    info.uname, info.gname = _owner_names(st.st_uid, st.st_gid)
+    return info
+
+
+@functools.lru_cache(maxsize=16)
+def _owner_names(uid: int, gid: int) -> tuple[str, str]:
+    """uid/gid → (uname, gname), as tarfile.gettarinfo would look them up."""
+    uname = gname = ""
+    try:
+        import pwd
+        uname = pwd.getpwuid(uid)[0]
+    except (ImportError, KeyError):
+        pass
+    try:
+        import grp
+        gname = grp.getgrgid(gid)[0]
+    except (ImportError, KeyError):
+        pass
+    return uname, gname
+
+
+def _compact_json(data: Any) -> bytes:
+    """Serialize machine-read JSON (artifact/manifest bytes) without padding."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _source_digest(
+    config: dict[str, Any],
+    files: dict[str, tuple[str, os.stat_result]],
+    compression: str,
+) -> str:
+    """Fingerprint pack inputs from metadata, file stats and small files' bytes.
+
+    (mtime_ns, size) alone misses a same-size rewrite within one mtime
+    tick, so small regular files (the chart sources) are hashed by
+    content. Larger files add inode and ctime, which a rewrite in place
+    or by rename changes, but can still miss an in-place same-size
+    rewrite within one tick.
+    """
+    h = hashlib.sha256()
+    h.update(compression.encode())
+    h.update(json.dumps(config, sort_keys=True).encode())
+    for arcname, (fp, st) in files.items():
+        h.update(
+            f"\0{arcname}\0{fp}\0{st.st_mtime_ns}\0{st.st_size}"
+            f"\0{st.st_ino}\0{st.st_ctime_ns}".encode()
+        )
+        if stat.S_ISREG(st.st_mode) and st.st_size <= _SOURCE_DIGEST_READ_MAX:
+            with open(fp, "rb") as f:
+                h.update(f.read())
+    return f"sha256:{h.hexdigest()}"
+
+
+# Regular files up to this size are fingerprinted by content
+_SOURCE_DIGEST_READ_MAX = 64 * 1024
+
+
+def _collect_chart_files(
+    chart_dir: Path,
+    name: str,
+) -> dict[str, tuple[str, os.stat_result]]:
+    """Map tar arcnames to (source path, lstat), in archive order.
+
+    The package dir is shipped both at the top level (bow_<name>/...) and
+    under src/. When it lives under src/, that tree is walked once and
+    both arcnames come from the same listing. Each file is stat'd once.
+    """
+    files: dict[str, tuple[str, os.stat_result]] = {}
+
+    src_root = chart_dir / "src"
+    root_files = list(_iter_chart_files(src_root)) if os.path.isdir(src_root) else []
+
+    # Chart source files
+    src_dir = _find_chart_src(chart_dir, name)
+    if src_dir:
+        if src_dir.parent == src_root:
+            prefix = str(src_dir) + os.sep
+            pkg_files = [e for e in root_files if e.path.startswith(prefix)]
+        else:
+            pkg_files = _iter_chart_files(src_dir)
+        for entry in pkg_files:
+            arcname = os.path.relpath(entry.path, src_dir.parent)
+            files.setdefault(arcname, (entry.path, entry.stat(follow_symlinks=False)))
+
+    # pyproject.toml (needed for pip install)
+    pyproject = chart_dir / "pyproject.toml"
+    if pyproject.exists():
+        files.setdefault("pyproject.toml", (str(pyproject), os.lstat(pyproject)))
+
+    # Preserve src directory structure (includes files like src/__init__.py)
+    for entry in root_files:
+        arcname = os.path.relpath(entry.path, chart_dir)
+        files.setdefault(arcname, (entry.path, entry.stat(follow_symlinks=False)))
+
+    return files
+
+
+# Directories never shipped in a chart artifact (dot-dirs are skipped too)
+_SKIP_DIRS = frozenset({"__pycache__", "node_modules"})
+
+
+def _iter_chart_files(root: str | Path) -> Iterator[os.DirEntry]:
+    """Yield chart file entries under root in sorted order.
+
+    Dot-entries and _SKIP_DIRS are pruned before descent, so their
+    contents are never stat'd. DirEntry caches its stat, so callers
+    that need one share a single syscall per file.
+    """
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in _SKIP_DIRS:
+                yield from _iter_chart_files(entry.path)
+        elif entry.is_file():
+            yield entry
 
 
 def unpack_chart(tar_path: str | Path, dest_dir: str | Path) -> Path:
-    """Extract a chart tar.gz into a directory.
+    """Extract a chart tar.gz (or tar.zst) into a directory.
 
     Returns:
         The extracted directory
@@ -244,8 +435,22 @@ def unpack_chart(tar_path: str | Path, dest_dir: str | Path) -> Path:
     dest_dir = Path(dest_dir)
     dest_dir.mkdir(parents=True, exist_ok=True)
 
-    with tarfile.open(tar_path, "r:gz") as tar:
-        tar.extractall(dest_dir, filter="data")
+    if tar_path.name.endswith(".tar.zst"):
+        zstd = _import_zstd()
+        with open(tar_path, "rb") as raw, \
+             zstd.ZstdDecompressor().stream_reader(raw) as zr:
+            with tarfile.open(
+                fileobj=zr, mode="r|",
+                bufsize=_TAR_BUFSIZE, copybufsize=_TAR_BUFSIZE,
+            ) as tar:
+                tar.extractall(dest_dir, filter="data")
+    else:
+        with open(tar_path, "rb") as raw, _open_gzip_reader(raw) as gz:
+            with tarfile.open(
+                fileobj=gz, mode="r|",
+                bufsize=_TAR_BUFSIZE, copybufsize=_TAR_BUFSIZE,
+            ) as tar:
+                tar.extractall(dest_dir, filter="data")
 
     return dest_dir
 
@@ -267,9 +472,23 @@ def _push_chart_local(
     tag_path = chart_path / artifact.version
     tag_path.mkdir(parents=True, exist_ok=True)
 
+    ref = f"{registry_url.rstrip('/')}/{artifact.name}:{artifact.version}"
+
+    manifest_file = tag_path / "manifest.json"
+
     if artifact.tar_path:
-        dest = tag_path / f"{artifact.name}-{artifact.version}.tar.gz"
-        shutil.copy2(artifact.tar_path, dest)
+        suffix = _artifact_suffix(artifact.tar_path)
+        dest = tag_path / f"{artifact.name}-{artifact.version}{suffix}"
+        # Re-push of the same artifact: tarball and manifest already in place
+        if dest.exists() and manifest_file.exists():
+            existing = _read_json_cached(*_stat_key(manifest_file))
+            if existing.get("config", {}).get("digest") == artifact.digest:
+                return ref
+        # A re-push in the other compression replaces the old tarball
+        for other in _ARTIFACT_SUFFIXES:
+            if other != suffix:
+                (tag_path / f"{artifact.name}-{artifact.version}{other}").unlink(missing_ok=True)
+        _fast_copy(artifact.tar_path, dest)
 
     manifest = {
         "schemaVersion": 2,
@@ -281,16 +500,16 @@ def _push_chart_local(
         },
         "layers": [
             {
-                "mediaType": CHART_CONTENT_MEDIA_TYPE,
+                "mediaType": artifact.media_type,
                 "digest": artifact.digest,
                 "size": artifact.tar_path.stat().st_size if artifact.tar_path else 0,
             }
         ],
     }
-    with open(tag_path / "manifest.json", "w") as f:
-        json.dump(manifest, f, indent=2)
+    manifest_file.write_bytes(_compact_json(manifest))
+    # Same-size rewrites can land within one mtime tick
+    _read_json_cached.cache_clear()
 
-    ref = f"{registry_url.rstrip('/')}/{artifact.name}:{artifact.version}"
     return ref
 
 
@@ -314,20 +533,28 @@ def _pull_chart_local(
     if not manifest_file.exists():
         raise OCIError(f"Manifest not found for {name}:{version}")
 
-    with open(manifest_file) as f:
-        manifest = json.load(f)
+    manifest = _read_json_cached(*_stat_key(manifest_file))
 
-    config = manifest.get("config", {}).get("data", {})
+    config = dict(manifest.get("config", {}).get("data", {}))
     digest = manifest.get("config", {}).get("digest", "")
-
-    tar_files = list(tag_path.glob("*.tar.gz"))
-    if not tar_files:
+    layers = manifest.get("layers") or [{}]
+    media_type = layers[0].get("mediaType", CHART_CONTENT_MEDIA_TYPE)
+
+    # The manifest's layer type names the tarball; never guess from the dir
+    suffix = _MEDIA_TYPE_SUFFIXES.get(media_type)
+    if suffix is None:
+        raise OCIError(f"Unsupported layer media type for {name}:{version}: {media_type}")
+    tar_file = tag_path / f"{name}-{version}{suffix}"
+    if not tar_file.exists():
         raise OCIError(f"No artifact found for {name}:{version}")
 
     cache_dir.mkdir(parents=True, exist_ok=True)
-    cache_tar = cache_dir / tar_files[0].name
-    if not cache_tar.exists():
-        shutil.copy2(tar_files[0], cache_tar)
+    if digest:
+        cache_tar = _cache_artifact(tar_file, cache_dir, digest)
+    else:
+        cache_tar = cache_dir / tar_file.name
+        if not cache_tar.exists():
+            _fast_copy(tar_file, cache_tar)
 
     return ChartArtifact(
         name=name,
@@ -337,6 +564,7 @@ def _pull_chart_local(
         registry=registry_url,
         tar_path=cache_tar,
         config=config,
+        media_type=media_type,
     )
 
 
@@ -362,9 +590,8 @@ def _push_chart_remote(
     client = _get_oras_client()
 
     # Write chart config as a temp JSON file for the manifest config
-    config_data = json.dumps(artifact.config or {}, indent=2)
-    config_file = Path(tempfile.mkdtemp()) / "chart-config.json"
-    config_file.write_text(config_data)
+    config_file = _work_dir(uuid.uuid4().hex) / "chart-config.json"
+    config_file.write_bytes(_compact_json(artifact.config or {}))
 
     # Prepare manifest annotations with chart metadata
     annotations = {
@@ -376,9 +603,9 @@ def _push_chart_remote(
         "org.opencontainers.image.version": artifact.version,
     }
 
-    # Push the tar.gz as a file with custom media type
+    # Push the tarball as a file with custom media type
     # oras format: "filepath:mediaType"
-    file_ref = f"{artifact.tar_path}:{CHART_CONTENT_MEDIA_TYPE}"
+    file_ref = f"{artifact.tar_path}:{artifact.media_type}"
 
     try:
         # Change to temp dir so oras doesn't complain about path validation
@@ -421,7 +648,7 @@ def _pull_chart_remote(
     cache_dir.mkdir(parents=True, exist_ok=True)
 
     # Download dir for oras pull
-    download_dir = Path(tempfile.mkdtemp())
+    download_dir = _work_dir(uuid.uuid4().hex)
 
     client = _get_oras_client()
 
@@ -436,11 +663,11 @@ def _pull_chart_remote(
     if not files:
         raise OCIError(f"No files in artifact {name}:{version}")
 
-    # Find the tar.gz among pulled files
+    # Find the tarball among pulled files
     tar_file = None
     config_data = {}
     for f in files:
-        if f.endswith(".tar.gz"):
+        if f.endswith(_ARTIFACT_SUFFIXES):
             tar_file = Path(f)
         elif f.endswith(".json"):
             try:
@@ -452,12 +679,10 @@ def _pull_chart_remote(
         # If no tar.gz, take the first file
         tar_file = Path(files[0])
 
-    # Copy to cache
-    cache_tar = cache_dir / f"{name}-{version}.tar.gz"
-    shutil.copy2(tar_file, cache_tar)
-
-    # Compute digest
-    digest = _compute_file_digest(cache_tar)
+    # Compute digest, then place in the (content-addressed) cache
+    suffix = _artifact_suffix(tar_file)
+    digest = _compute_file_digest(tar_file)
+    cache_tar = _cache_artifact(tar_file, cache_dir, digest, verified=True)
 
     # Try to get config from manifest annotations
     try:
@@ -482,6 +707,7 @@ def _pull_chart_remote(
         registry=registry_url,
         tar_path=cache_tar,
         config=config_data,
+        media_type=_SUFFIX_MEDIA_TYPES[suffix],
     )
 
 
@@ -535,16 +761,17 @@ def _list_remote_charts_local(registry_url: str) -> list[dict[str, str]]:
     if not registry_path.exists():
         return []
 
-    charts = []
-    for chart_dir in sorted(registry_path.iterdir()):
-        if chart_dir.is_dir():
-            for version_dir in sorted(chart_dir.iterdir()):
-                if version_dir.is_dir():
-                    charts.append({
-                        "name": chart_dir.name,
-                        "version": version_dir.name,
-                    })
-    return charts
+    return [
+        {"name": chart_dir.name, "version": version_dir.name}
+        for chart_dir in _sorted_subdirs(registry_path)
+        for version_dir in _sorted_subdirs(chart_dir.path)
+    ]
+
+
+def _sorted_subdirs(path: str | Path) -> list[os.DirEntry]:
+    """Subdirectories of path sorted by name (d_type, no per-entry stat)."""
+    with os.scandir(path) as it:
+        return sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
 
 
 def _list_remote_charts_oras(registry_url: str) -> list[dict[str, str]]:
@@ -580,8 +807,7 @@ def _read_chart_config(chart_dir: Path) -> dict[str, Any]:
     # 1. chart.json (new format)
     chart_json = chart_dir / "chart.json"
     if chart_json.exists():
-        with open(chart_json) as f:
-            return json.load(f)
+        return dict(_read_json_cached(*_stat_key(chart_json)))
 
     # 2. Parse from pyproject.toml
     pyproject = chart_dir / "pyproject.toml"
@@ -593,9 +819,30 @@ def _read_chart_config(chart_dir: Path) -> dict[str, Any]:
 
 def _parse_pyproject_config(pyproject: Path) -> dict[str, Any]:
     """Read chart config from pyproject.toml."""
+    return dict(_parse_pyproject_cached(*_stat_key(pyproject)))
+
+
+# Parsed metadata files, keyed on (path, mtime_ns, size) so edits are
+# picked up. Cached values are shared: callers get a top-level copy.
+
+def _stat_key(path: Path) -> tuple[str, int, int]:
+    st = path.stat()
+    return str(path), st.st_mtime_ns, st.st_size
+
+
+@functools.lru_cache(maxsize=256)
+def _read_json_cached(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_pyproject_cached(
+    path: str, mtime_ns: int, size: int,
+) -> dict[str, Any]:
     # Simple TOML parser (only the parts we need)
     import tomllib
-    with open(pyproject, "rb") as f:
+    with open(path, "rb") as f:
         data = tomllib.load(f)
 
     project = data.get("project", {})
@@ -618,23 +865,211 @@ def _parse_pyproject_config(pyproject: Path) -> dict[str, Any]:
 def _find_chart_src(chart_dir: Path, chart_name: str) -> Path | None:
     """Find the chart source directory."""
     # bow-postgresql → bow_postgresql
-    pkg_name = f"bow_{chart_name}"
-    src = chart_dir / "src" / pkg_name
-    if src.exists():
-        return src
+    src = os.path.join(chart_dir, "src", f"bow_{chart_name}")
+    if os.path.isdir(src):
+        return Path(src)
     # Directly under chart_dir
-    init = chart_dir / "__init__.py"
-    if init.exists():
+    if os.path.isfile(os.path.join(chart_dir, "__init__.py")):
         return chart_dir
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _work_root() -> Path:
+    """Per-process scratch directory, removed at interpreter exit."""
+    root = Path(tempfile.mkdtemp(prefix="bow-"))
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    return root
+
+
+def _work_dir(key: str) -> Path:
+    """Return (creating if needed) a named subdirectory of the work root."""
+    path = _work_root() / key
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def _import_zstd():
+    """Import the optional zstandard module."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise OCIError(
+            "zstd compression requires the 'zstandard' package. "
+            "Install it with: pip install 'bow-cli[zstd]'"
+        ) from e
+    return zstandard
+
+
+# Block size for streamed tar I/O and per-member copies (stdlib: 10/16 KiB)
+_TAR_BUFSIZE = 2 * 1024 * 1024
+
+# Threaded gzip drop-ins, tried in order before pigz / stdlib gzip
+_GZIP_MODULES = ("isal.igzip_threaded", "zlib_ng.gzip_ng_threaded")
+
+
+# gzip readers with SIMD inflate/CRC, tried in order before stdlib gzip
+_GZIP_READ_MODULES = ("isal.igzip", "zlib_ng.gzip_ng")
+
+
+def _open_gzip_reader(raw: BinaryIO) -> BinaryIO:
+    """Return a gzip-decompressing reader over raw (fastest available)."""
+    for module_name in _GZIP_READ_MODULES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        return module.open(raw, "rb")
+    return gzip.open(raw, "rb")
+
+
+@contextlib.contextmanager
+def _open_gzip_writer(out: BinaryIO) -> Iterator[BinaryIO]:
+    """Yield a writer that gzip-compresses into out.
+
+    Prefers python-isal / zlib-ng (multi-threaded, in-process), then an
+    external pigz, and falls back to stdlib gzip at level 6.
+    """
+    threads = os.cpu_count() or 1
+
+    for module_name in _GZIP_MODULES:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        with module.open(out, "wb", threads=threads) as gz:
+            yield gz
+        return
+
+    pigz = shutil.which("pigz")
+    if pigz:
+        proc = subprocess.Popen(
+            [pigz, "-p", str(threads), "-c"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        # Pump pigz output through out (rather than handing pigz the fd)
+        # so wrappers such as _HashingWriter see the compressed bytes.
+        pump = threading.Thread(
+            target=shutil.copyfileobj,
+            args=(proc.stdout, out, _TAR_BUFSIZE),
+        )
+        pump.start()
+        try:
+            yield proc.stdin
+        finally:
+            proc.stdin.close()
+            pump.join()
+            proc.stdout.close()
+            returncode = proc.wait()
+        if returncode != 0:
+            raise OCIError(f"pigz exited with status {returncode}")
+        return
+
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
+        yield gz
+
+
+class _HashingWriter:
+    """Write-through wrapper that sha256-hashes the bytes written."""
+
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        self.hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.hash.update(data)
+        return self.fp.write(data)
+
+    def flush(self) -> None:
+        self.fp.flush()
+
+    @property
+    def digest(self) -> str:
+        return f"sha256:{self.hash.hexdigest()}"
+
+
+def _artifact_suffix(path: Path) -> str:
+    """Return the artifact suffix (.tar.gz / .tar.zst) of a tarball path."""
+    for suffix in _ARTIFACT_SUFFIXES:
+        if path.name.endswith(suffix):
+            return suffix
+    return ".tar.gz"
+
+
+def _cache_artifact(
+    src: Path,
+    cache_dir: Path,
+    digest: str,
+    verified: bool = False,
+) -> Path:
+    """Place a tarball in the chart cache under its digest.
+
+    Entries are named sha256_<hex>.tar.gz, so a re-pushed name:version
+    is never served stale. An existing entry is hashed once against
+    digest, then trusted via a .verified marker; a mismatch is replaced.
+    A fresh copy is hashed too (unless the caller already computed
+    digest from src): a source that doesn't match raises OCIError.
+    """
+    cache_tar = cache_dir / f"{digest.replace(':', '_')}{_artifact_suffix(src)}"
+    marker = cache_tar.with_name(cache_tar.name + ".verified")
+
+    if cache_tar.exists():
+        if marker.exists():
+            return cache_tar
+        if _compute_file_digest(cache_tar) == digest:
+            marker.touch()
+            return cache_tar
+
+    _fast_copy(src, cache_tar)
+    if verified:
+        marker.touch()
+    else:
+        actual = _compute_file_digest(cache_tar)
+        if actual != digest:
+            cache_tar.unlink()
+            raise OCIError(
+                f"Digest mismatch for {src.name}: expected {digest}, got {actual}"
+            )
+    return cache_tar
+
+
+# ioctl request number for FICLONE (linux/fs.h)
+_FICLONE = 0x40049409
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Copy an artifact tarball: hardlink, else reflink, else byte copy.
+
+    Artifacts are never modified in place (pack_chart writes a new
+    inode), so sharing one between work dir, registry and cache is safe.
+    """
+    if dst.exists():
+        if os.path.samefile(src, dst):
+            return
+        dst.unlink()
+
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+
+    try:
+        import fcntl
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+
+    shutil.copyfile(src, dst)
+
+
 def _compute_file_digest(path: Path) -> str:
     """Compute the SHA256 digest of a file."""
-    h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
+        h = hashlib.file_digest(f, "sha256")
     return f"sha256:{h.hexdigest()}"
 
 
@@ -645,14 +1080,14 @@ def _resolve_registry_path(url: str) -> Path:
     oci:///absolute/path → /absolute/path
     file:///path → /path
     """
-    from bow.oci.config import BOW_HOME
+    from bow.oci.config import bow_home
 
     url = url.strip()
     if url.startswith("oci://"):
         remainder = url[6:]
         if remainder.startswith("/"):
             return Path(remainder)
-        return BOW_HOME / "registry" / remainder
+        return bow_home() / "registry" / remainder
     if url.startswith("file://"):
         return Path(url[7:])
-    return BOW_HOME / "registry" / url
+    return bow_home() / "registry" / url
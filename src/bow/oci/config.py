@@ -20,12 +20,19 @@ bow.oci.config — Global config management.
 
 from __future__ import annotations
 
+import functools
+import json
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from bow._yaml import (
+    HAS_LIBYAML as _HAS_LIBYAML, SafeDumper as _SafeDumper, SafeLoader as _SafeLoader,
+)
+
 
 BOW_HOME = Path.home() / ".bow"
 
@@ -68,15 +75,24 @@ class BowConfig:
         """Check if registry URL is in the whitelist."""
         if not self.allowed_registries:
             return True  # Empty whitelist allows all
-        normalized = url.rstrip("/")
-        return any(
-            normalized.startswith(allowed.rstrip("/"))
-            for allowed in self.allowed_registries
-        )
+        prefixes = _allowed_prefixes(tuple(self.allowed_registries))
+        return url.rstrip("/").startswith(prefixes)
+
+
+@functools.lru_cache(maxsize=32)
+def _allowed_prefixes(allowed: tuple[str, ...]) -> tuple[str, ...]:
+    """Normalized whitelist prefixes, for a single str.startswith call."""
+    return tuple(a.rstrip("/") for a in allowed)
+
+
+def bow_home() -> Path:
+    """bow's home directory: $BOW_HOME if set, else ~/.bow."""
+    home = os.environ.get("BOW_HOME", "").strip()
+    return Path(home) if home else BOW_HOME
 
 
 def config_path() -> Path:
-    return BOW_HOME / "config.yaml"
+    return bow_home() / "config.yaml"
 
 
 def load_config() -> BowConfig:
@@ -85,8 +101,8 @@ def load_config() -> BowConfig:
     if not cp.exists():
         return BowConfig()
 
-    with open(cp) as f:
-        data = yaml.safe_load(f) or {}
+    st = cp.stat()
+    data = _read_config_data(str(cp), st.st_mtime_ns, st.st_size)
 
     cfg = BowConfig()
     cfg.active_env = data.get("active_env", "default")
@@ -102,14 +118,21 @@ def load_config() -> BowConfig:
 
     # Security
     security = data.get("security", {})
-    cfg.allowed_registries = security.get("allowed_registries", [])
+    cfg.allowed_registries = list(security.get("allowed_registries", []))
 
     return cfg
 
 
+@functools.lru_cache(maxsize=8)
+def _read_config_data(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    """Parse config.yaml, cached on (path, mtime_ns, size)."""
+    with open(path) as f:
+        return yaml.load(f, Loader=_SafeLoader) or {}
+
+
 def save_config(cfg: BowConfig) -> None:
     """Write ~/.bow/config.yaml."""
-    BOW_HOME.mkdir(parents=True, exist_ok=True)
+    bow_home().mkdir(parents=True, exist_ok=True)
 
     data: dict[str, Any] = {}
 
@@ -130,4 +153,13 @@ def save_config(cfg: BowConfig) -> None:
         }
 
     with open(config_path(), "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        if _HAS_LIBYAML:
+            yaml.dump(
+                data, f, Dumper=_SafeDumper,
+                default_flow_style=False, sort_keys=False,
+            )
+        else:
+            # JSON is valid YAML; skips PyYAML's pure-Python emitter
+            json.dump(data, f, indent=2)
+    # Same-size rewrites can land within one mtime tick
+    _read_config_data.cache_clear()
@@ -21,19 +21,23 @@ Per-project override: .bowenv file
 
 from __future__ import annotations
 
+import functools
+import os
 import subprocess
 import sys
 import venv
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 import yaml
 
-from bow.oci.config import BOW_HOME, load_config, save_config
+from bow.oci.config import bow_home, load_config, save_config
 
 
-ENVS_DIR = BOW_HOME / "envs"
+def envs_dir() -> Path:
+    """Directory holding all envs (<bow home>/envs)."""
+    return bow_home() / "envs"
 
 
 @dataclass
@@ -85,20 +89,13 @@ class EnvError(Exception):
 
 def create_env(name: str, description: str = "") -> EnvInfo:
     """Create a new environment."""
-    env_path = ENVS_DIR / name
+    env_path = envs_dir() / name
     if env_path.exists():
         raise EnvError(f"Environment '{name}' already exists")
 
     env_path.mkdir(parents=True, exist_ok=True)
 
-    # Create venv
-    venv_path = env_path / "venv"
-    venv.create(str(venv_path), with_pip=True, clear=True)
-
-    # Install bow into the venv (not editable, just import path)
-    # bow CLI runs on the host system; venv is only for charts
-    # But bow is needed for entry_points to work
-    _pip_install_bow(venv_path)
+    _create_venv(env_path / "venv")
 
     # Cache dir
     (env_path / "cache").mkdir(exist_ok=True)
@@ -116,8 +113,24 @@ def create_env(name: str, description: str = "") -> EnvInfo:
     return info
 
 
+def _create_venv(venv_path: Path) -> None:
+    """Create the env's venv, with pip and bow installed."""
+    venv.create(str(venv_path), with_pip=True, clear=True)
+
+    # Install bow into the venv (not editable, just import path)
+    # bow CLI runs on the host system; venv is only for charts
+    # But bow is needed for entry_points to work
+    _pip_install_bow(venv_path)
+
+
 def _pip_install_bow(venv_path: Path) -> None:
-    """Install the bow package into the venv."""
+    """Install the bow package into the venv.
+
+    --no-deps: the venv's site-packages is only injected into the host
+    interpreter (see bow.chart.registry), which already has bow's
+    dependencies. Skipping their resolution avoids most of the install
+    time.
+    """
     pip = venv_path / "bin" / "pip"
     # Find bow itself
     import bow
@@ -126,13 +139,13 @@ def _pip_install_bow(venv_path: Path) -> None:
     pyproject = bow_root / "pyproject.toml"
     if pyproject.exists():
         subprocess.run(
-            [str(pip), "install", "-e", str(bow_root), "-q"],
+            [str(pip), "install", "--no-deps", "-e", str(bow_root), "-q"],
             capture_output=True, text=True,
         )
     else:
         # Fallback: pip install bow
         subprocess.run(
-            [str(pip), "install", "bow", "-q"],
+            [str(pip), "install", "--no-deps", "bow", "-q"],
             capture_output=True, text=True,
         )
 
@@ -142,7 +155,7 @@ def delete_env(name: str) -> None:
     if name == "default":
         raise EnvError("Cannot delete the default environment")
 
-    env_path = ENVS_DIR / name
+    env_path = envs_dir() / name
     if not env_path.exists():
         raise EnvError(f"Environment '{name}' not found")
 
@@ -161,7 +174,7 @@ def get_env(name: str | None = None) -> EnvInfo:
     if name is None:
         name = resolve_active_env()
 
-    env_path = ENVS_DIR / name
+    env_path = envs_dir() / name
     if not env_path.exists():
         # Auto-create default if it doesn't exist
         if name == "default":
@@ -180,33 +193,45 @@ def resolve_active_env() -> str:
       3. ~/.bow/config.yaml active_env
       4. "default"
     """
-    import os
-
     # 1. Env var
     env_var = os.environ.get("BOW_ENV", "").strip()
     if env_var:
         return env_var
 
     # 2. .bowenv file
-    cwd = Path.cwd()
-    for parent in [cwd, *cwd.parents]:
-        bowenv = parent / ".bowenv"
-        if bowenv.exists():
-            content = bowenv.read_text().strip()
-            if content:
-                return content
-        # Search up to /home or /
-        if parent == Path.home() or parent == Path("/"):
-            break
+    found = _find_bowenv(os.getcwd(), str(Path.home()))
+    if found:
+        return found
 
     # 3. Config
     cfg = load_config()
     return cfg.active_env or "default"
 
 
+@functools.lru_cache(maxsize=16)
+def _find_bowenv(cwd: str, home: str) -> str | None:
+    """Search upward from cwd (up to home or /) for a non-empty .bowenv.
+
+    Cached per process: the lookup runs on every env resolution.
+    """
+    path = cwd
+    while True:
+        try:
+            with open(os.path.join(path, ".bowenv")) as f:
+                content = f.read().strip()
+        except (FileNotFoundError, NotADirectoryError):
+            content = ""
+        if content:
+            return content
+        parent = os.path.dirname(path)
+        if path == home or parent == path:
+            return None
+        path = parent
+
+
 def use_env(name: str) -> None:
     """Switch the active environment."""
-    env_path = ENVS_DIR / name
+    env_path = envs_dir() / name
     if not env_path.exists():
         raise EnvError(f"Environment '{name}' not found. Run: bow env create {name}")
 
@@ -217,21 +242,28 @@ def use_env(name: str) -> None:
 
 def list_envs() -> list[EnvInfo]:
     """List all environments."""
-    if not ENVS_DIR.exists():
+    root = envs_dir()
+    if not root.exists():
         return []
 
-    envs = []
-    for d in sorted(ENVS_DIR.iterdir()):
-        if d.is_dir() and (d / "venv").exists():
-            envs.append(EnvInfo(name=d.name, path=d))
-    return envs
+    with os.scandir(root) as it:
+        entries = sorted((e for e in it if e.is_dir()), key=lambda e: e.name)
+    return [
+        EnvInfo(name=e.name, path=Path(e.path))
+        for e in entries
+        if os.path.exists(os.path.join(e.path, "venv"))
+    ]
 
 
 def pip_install_in_env(
-    package_path: str | Path,
+    package_path: str | Path | Sequence[str | Path],
     env: EnvInfo | None = None,
 ) -> subprocess.CompletedProcess:
-    """Run pip install in the env's venv."""
+    """Run pip install in the env's venv.
+
+    Accepts one package path or several; several are installed with a
+    single pip invocation (one interpreter start, one resolve).
+    """
     if env is None:
         env = get_env()
 
@@ -239,8 +271,11 @@ def pip_install_in_env(
     if not pip.exists():
         raise EnvError(f"pip not found in env '{env.name}': {pip}")
 
+    if isinstance(package_path, (str, Path)):
+        package_path = [package_path]
+
     return subprocess.run(
-        [str(pip), "install", str(package_path), "-q"],
+        [str(pip), "install", *map(str, package_path), "-q"],
         capture_output=True, text=True,
     )
 
@@ -0,0 +1,38 @@
+"""
+bow.stack._yaml_cache — Parsed YAML cache for stack, overlay and lock files.
+
+Entries are keyed on (absolute path, mtime_ns, size): an edited file is
+re-parsed, an unchanged one is served from memory. Callers always get a
+deep copy, because stack data is mutated while merging overlays.
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import os
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from bow._yaml import SafeLoader as _SafeLoader
+
+
+def load_yaml_cached(path: str | Path) -> Any:
+    """Parse a YAML file, reusing the result while the file is unchanged."""
+    abspath = os.path.abspath(path)
+    st = os.stat(abspath)
+    return copy.deepcopy(_load(abspath, st.st_mtime_ns, st.st_size))
+
+
+def clear_yaml_cache() -> None:
+    """Drop every cached parse. Call after bow rewrites a file it reads here."""
+    _load.cache_clear()
+
+
+@functools.lru_cache(maxsize=256)
+def _load(path: str, mtime_ns: int, size: int) -> Any:
+    # Bytes straight to the loader: it detects the encoding itself
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
@@ -9,6 +9,8 @@ resolves references, renders charts in order.
 
 from __future__ import annotations
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -16,6 +18,7 @@ from bow.chart.registry import get_chart
 from bow.chart.values import deep_merge
 from bow.core.manifest import manifest, Manifest
 from bow.core.resource import set_tracking
+from bow.core.stack import _collected
 from bow.stack.parser import parse_stack_dict, StackSpec, StackParseError
 from bow.stack.refs import resolve_refs, RefError
 from bow.stack.merger import merge_stack_files, apply_set_to_stack
@@ -46,12 +49,10 @@ def render_stack(
 
     # 2. Apply --set (stack-aware)
     if set_args:
-        stack_set, chart_set = _split_set_args(set_args)
-        if stack_set:
-            # components.X.values.Y=Z format → apply as dict overlay
-            _apply_component_overrides(merged_data, stack_set)
+        # components.X.values.Y=Z format → apply as dict overlay.
         # Remaining --set args are ignored for now
         # (could be used for stack-level metadata override etc.)
+        _apply_component_overrides(merged_data, set_args)
 
     # 3. Parse
     try:
@@ -69,16 +70,22 @@ def render_stack(
     except RefError as e:
         raise StackError(f"Reference error: {e}") from e
 
-    # 5. Render charts in order
-    with manifest() as m:
-        for comp in resolved_components:
-            chart = get_chart(comp.chart)
-            if chart is None:
-                raise StackError(
-                    f"Chart '{comp.chart}' not found for component '{comp.name}'. "
-                    f"Install it with: pip install bow-{comp.chart}"
-                )
+    # 5. Look up charts (in order, so the first missing one is reported)
+    charts = []
+    for comp in resolved_components:
+        chart = get_chart(comp.chart)
+        if chart is None:
+            raise StackError(
+                f"Chart '{comp.chart}' not found for component '{comp.name}'. "
+                f"Install it with: pip install bow-{comp.chart}"
+            )
+        charts.append(chart)
 
+    # 6. Render charts. References are already resolved, so components
+    # are independent: each renders on a worker thread into its own
+    # (context-local) manifest, and results are joined in stack order.
+    def render_component(comp: Any, chart: Any) -> list:
+        with manifest() as part:
             # Tracking labels
             set_tracking(
                 chart=comp.chart,
@@ -95,31 +102,29 @@ def render_stack(
 
             # Chart render
             chart.render(values)
+        return part.resources
+
+    # Rendering is mostly file/YAML I/O: size like the executor default
+    workers = max(1, min(len(charts), (os.cpu_count() or 1) + 4))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_component, comp, chart)
+            for comp, chart in zip(resolved_components, charts)
+        ]
+        with manifest() as m:
+            collected = _collected()
+            for future in futures:
+                collected.extend(future.result())
 
     return m
 
 
-def _split_set_args(set_args: list[str]) -> tuple[list[str], list[str]]:
-    """Split --set args into stack vs other.
-
-    components.X.values.Y=Z → stack_set
-    other → other_set
-    """
-    stack_set = []
-    other_set = []
-    for arg in set_args:
-        if arg.startswith("components."):
-            stack_set.append(arg)
-        else:
-            other_set.append(arg)
-    return stack_set, other_set
-
-
 def _apply_component_overrides(data: dict[str, Any], set_args: list[str]) -> None:
     """Apply --set in components.X.values.Y=Z format.
 
     Deep merges into the matching component's values
     without breaking the stack's components list.
+    Args without the components. prefix are skipped.
     """
     from bow.chart.values import parse_set_values, deep_merge as dm
 
@@ -128,29 +133,30 @@ def _apply_component_overrides(data: dict[str, Any], set_args: list[str]) -> Non
         return
 
     # Component name → index mapping
-    comp_by_name: dict[str, int] = {}
-    for i, comp in enumerate(components):
-        name = comp.get("name", comp.get("chart", ""))
-        comp_by_name[name] = i
+    comp_by_name = {
+        comp.get("name", comp.get("chart", "")): i
+        for i, comp in enumerate(components)
+    }
 
     for arg in set_args:
+        if not arg.startswith("components."):
+            continue
+
         # components.main-db.values.replicas=9
         # → parts: ["components", "main-db", "values", "replicas"]
-        key, value = arg.split("=", 1)
-        parts = key.split(".")
+        key, sep, value = arg.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid --set format: '{arg}' (expected key=value)")
+        parts = key.split(".", 3)
 
-        if len(parts) < 4 or parts[0] != "components" or parts[2] != "values":
+        if len(parts) < 4 or parts[2] != "values":
             continue
 
-        comp_name = parts[1]
-        value_key = ".".join(parts[3:])
-
-        if comp_name not in comp_by_name:
+        idx = comp_by_name.get(parts[1])
+        if idx is None:
             continue
-
-        idx = comp_by_name[comp_name]
         comp = components[idx]
 
         # Values override
-        override = parse_set_values([f"{value_key}={value}"])
+        override = parse_set_values([f"{parts[3]}={value}"])
         comp["values"] = dm(comp.get("values", {}), override)
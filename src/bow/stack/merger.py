@@ -25,9 +25,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
-import yaml
-
 from bow.chart.values import deep_merge
+from bow.stack._yaml_cache import load_yaml_cached
 
 
 def merge_stack_files(file_paths: list[str | Path]) -> dict[str, Any]:
@@ -40,7 +39,8 @@ def merge_stack_files(file_paths: list[str | Path]) -> dict[str, Any]:
         file_paths: File paths list (in precedence order)
 
     Returns:
-        Merged stack dict
+        Merged stack dict (equal small leaf mappings may be shared
+        objects; copy before mutating nested values)
     """
     if not file_paths:
         raise ValueError("At least one file is required")
@@ -48,12 +48,14 @@ def merge_stack_files(file_paths: list[str | Path]) -> dict[str, Any]:
     # First file: base stack
     base = _load_yaml(file_paths[0])
 
-    # Subsequent files: overlays
-    for fp in file_paths[1:]:
-        overlay = _load_yaml(fp)
-        base = _merge_overlay(base, overlay)
-
-    return base
+    # Subsequent files: overlays, flattened to patches and applied in one pass
+    patches = [
+        patch
+        for fp in file_paths[1:]
+        for patch in _overlay_to_patches(_load_yaml(fp))
+    ]
+    merged = _apply_patches(base, patches)
+    return _share_leaf_dicts(merged, {})
 
 
 def apply_set_to_stack(
@@ -80,21 +82,59 @@ def apply_set_to_stack(
 def _load_yaml(path: str | Path) -> dict[str, Any]:
     """Read a YAML file."""
     p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"File not found: {p}")
-    with open(p) as f:
-        data = yaml.safe_load(f)
+    try:
+        data = load_yaml_cached(p)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"File not found: {p}") from e
     if not isinstance(data, dict):
         raise ValueError(f"Expected YAML mapping in {p}")
     return data
 
 
-def _merge_overlay(base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, Any]:
-    """Apply an overlay to the base stack.
+# Scalar-only mappings up to this size are shared between equal copies
+_SHARE_MAX_ITEMS = 8
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _share_leaf_dicts(data: Any, cache: dict[tuple, dict]) -> Any:
+    """Replace equal small scalar-only dicts with one shared instance.
+
+    Overlays often repeat the same leaf mapping across components
+    (resources, image, ...); sharing them saves memory and lets the
+    id()-keyed ref scan in bow.stack.refs treat them once. The key
+    includes key/value types so 1, 1.0 and True stay distinct. The
+    result must be treated as read-only: copy before mutating.
+    """
+    if isinstance(data, list):
+        for i, item in enumerate(data):
+            data[i] = _share_leaf_dicts(item, cache)
+        return data
+    if not isinstance(data, dict):
+        return data
+
+    leaf = len(data) <= _SHARE_MAX_ITEMS
+    for key, value in data.items():
+        if isinstance(value, (dict, list)):
+            data[key] = _share_leaf_dicts(value, cache)
+            leaf = False
+        elif not isinstance(value, _SCALARS) or not isinstance(key, _SCALARS):
+            leaf = False
+    if not leaf or not data:
+        return data
+
+    sig = tuple((type(k), k, type(v), v) for k, v in data.items())
+    return cache.setdefault(sig, data)
+
+
+_Patch = tuple[tuple[str, ...], Any]
+
+
+def _overlay_to_patches(overlay: dict[str, Any]) -> list[_Patch]:
+    """Flatten an overlay into (path, value) patches.
 
     The overlay supports two formats:
 
-    Format 1 — Tam stack (apiVersion + components list):
+    Format 1 — Full stack (apiVersion + components list):
         apiVersion: bow.io/v1
         components:
           - chart: postgresql
@@ -107,81 +147,102 @@ def _merge_overlay(base: dict[str, Any], overlay: dict[str, Any]) -> dict[str, A
           main-db:
             values:
               replicas: 3
-    """
-    result = dict(base)
 
+    Component paths start with ("components", <name>); the bare
+    ("components", <name>) patch marks a Format 1 entry, which is
+    appended when the base has no component by that name. Format 2
+    entries only touch existing components.
+    """
     if "components" not in overlay:
-        return result
+        return []
 
     overlay_components = overlay["components"]
+    patches: list[_Patch] = []
 
     # Format 2: dict mapping (name → overrides)
     if isinstance(overlay_components, dict):
-        result["components"] = _merge_components_dict(
-            result.get("components", []),
-            overlay_components,
-        )
-    # Format 1: list (tam component listesi)
+        patches.append((("components",), []))
+        for name, overrides in overlay_components.items():
+            if isinstance(overrides, dict):
+                patches.extend(_flatten(overrides, ("components", name)))
+    # Format 1: list (full component list)
     elif isinstance(overlay_components, list):
-        result["components"] = _merge_components_list(
-            result.get("components", []),
-            overlay_components,
-        )
+        patches.append((("components",), []))
+        for comp in overlay_components:
+            name = comp.get("name", comp.get("chart", ""))
+            patches.append((("components", name), {}))
+            patches.extend(_flatten(comp, ("components", name)))
 
     # Metadata overlay
     if "metadata" in overlay:
-        result["metadata"] = deep_merge(
-            result.get("metadata", {}),
-            overlay["metadata"],
-        )
-
-    return result
-
-
-def _merge_components_dict(
-    base_components: list[dict],
-    overlay_map: dict[str, dict],
-) -> list[dict]:
-    """Component dict overlay: name → values merge."""
-    result = []
-    for comp in base_components:
-        comp_name = comp.get("name", comp.get("chart", ""))
-        if comp_name in overlay_map:
-            merged = deep_merge(comp, overlay_map[comp_name])
-            result.append(merged)
-        else:
-            result.append(dict(comp))
-    return result
-
-
-def _merge_components_list(
-    base_components: list[dict],
-    overlay_components: list[dict],
-) -> list[dict]:
-    """Component list overlay: match by name and merge."""
-    # Index base by name
-    base_by_name: dict[str, dict] = {}
-    for comp in base_components:
-        name = comp.get("name", comp.get("chart", ""))
-        base_by_name[name] = comp
-
-    # Merge each component in the overlay
-    result_by_name: dict[str, dict] = dict(base_by_name)
-    for comp in overlay_components:
-        name = comp.get("name", comp.get("chart", ""))
-        if name in result_by_name:
-            result_by_name[name] = deep_merge(result_by_name[name], comp)
+        patches.extend(_flatten({"metadata": overlay["metadata"]}))
+
+    return patches
+
+
+def _flatten(data: dict[str, Any], prefix: tuple[str, ...] = ()) -> list[_Patch]:
+    """Flatten nested dicts into (path, leaf) pairs.
+
+    Non-empty dicts are descended into; everything else (including an
+    empty dict) is a leaf.
+
+    >>> _flatten({"a": {"b": 1, "c": {}}, "d": [1]})
+    [(('a', 'b'), 1), (('a', 'c'), {}), (('d',), [1])]
+    """
+    patches: list[_Patch] = []
+    for key, value in data.items():
+        path = prefix + (key,)
+        if isinstance(value, dict) and value:
+            patches.extend(_flatten(value, path))
         else:
-            result_by_name[name] = comp
-
-    # Preserve order (base order + new additions)
-    ordered: list[dict] = []
-    seen: set[str] = set()
-    for comp in base_components:
-        name = comp.get("name", comp.get("chart", ""))
-        ordered.append(result_by_name[name])
-        seen.add(name)
-    for name, comp in result_by_name.items():
-        if name not in seen:
-            ordered.append(comp)
-    return ordered
+            patches.append((path, value))
+    return patches
+
+
+def _apply_patches(base: dict[str, Any], patches: list[_Patch]) -> dict[str, Any]:
+    """Apply flattened overlay patches to base in place.
+
+    Same result as deep_merge per overlay: dicts merge, anything else
+    is replaced. Components are matched by name through an index that
+    is built once and kept up to date as components are appended.
+    """
+    components: list[dict] | None = None
+    index: dict[str, int] = {}
+
+    for path, value in patches:
+        if path[0] != "components":
+            _set_path(base, path, value)
+            continue
+
+        if components is None:
+            components = base.setdefault("components", [])
+            for i, comp in enumerate(components):
+                index[comp.get("name", comp.get("chart", ""))] = i
+        if len(path) == 1:
+            continue
+
+        name = path[1]
+        idx = index.get(name)
+        if idx is None:
+            if len(path) > 2:
+                continue  # Format 2 override for an unknown component
+            idx = index[name] = len(components)
+            components.append({})
+        if len(path) > 2:
+            _set_path(components[idx], path[2:], value)
+
+    return base
+
+
+def _set_path(data: dict[str, Any], path: tuple[str, ...], value: Any) -> None:
+    """Set value at path, replacing non-dict intermediates with dicts."""
+    for key in path[:-1]:
+        child = data.get(key)
+        if not isinstance(child, dict):
+            child = data[key] = {}
+        data = child
+
+    last = path[-1]
+    if isinstance(value, dict) and isinstance(data.get(last), dict):
+        return  # Empty dict merged into a dict: nothing to change
+    data[last] = value
@@ -24,12 +24,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from sys import intern
+from types import MappingProxyType
+from typing import Any, Mapping
 
-import yaml
+from bow.stack._yaml_cache import load_yaml_cached
 
 
-@dataclass
+@dataclass(slots=True)
 class ComponentSpec:
     """A single stack component."""
     chart: str
@@ -37,13 +39,16 @@ class ComponentSpec:
     values: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class StackSpec:
-    """Parsed stack definition."""
+    """Parsed stack definition.
+
+    raw is a read-only view of the source dict (not a copy).
+    """
     name: str
     namespace: str | None = None
     components: list[ComponentSpec] = field(default_factory=list)
-    raw: dict[str, Any] = field(default_factory=dict)
+    raw: Mapping[str, Any] = field(default_factory=dict)
 
 
 class StackParseError(Exception):
@@ -65,11 +70,10 @@ def parse_stack_file(path: str | Path) -> StackSpec:
         FileNotFoundError: File not found
     """
     p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Stack file not found: {p}")
-
-    with open(p) as f:
-        data = yaml.safe_load(f)
+    try:
+        data = load_yaml_cached(p)
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Stack file not found: {p}") from e
 
     if not isinstance(data, dict):
         raise StackParseError(f"Stack file must be a YAML mapping, got {type(data).__name__}")
@@ -117,7 +121,8 @@ def parse_stack_dict(data: dict[str, Any]) -> StackSpec:
         raise StackParseError("components must be a list")
 
     components: list[ComponentSpec] = []
-    seen_names: set[str] = set()
+    append = components.append
+    spec = ComponentSpec
 
     for i, comp in enumerate(components_raw):
         if not isinstance(comp, dict):
@@ -127,28 +132,32 @@ def parse_stack_dict(data: dict[str, Any]) -> StackSpec:
         if not chart:
             raise StackParseError(f"components[{i}].chart is required")
 
-        comp_name = comp.get("name", chart)
-
-        if comp_name in seen_names:
-            raise StackParseError(
-                f"Duplicate component name: '{comp_name}'. "
-                f"Use 'name' field to distinguish multiple instances of the same chart."
-            )
-        seen_names.add(comp_name)
-
         values = comp.get("values", {})
         if not isinstance(values, dict):
             raise StackParseError(f"components[{i}].values must be a mapping")
 
-        components.append(ComponentSpec(
-            chart=chart,
-            name=comp_name,
-            values=values,
-        ))
+        comp_name = comp.get("name", chart)
+        if type(comp_name) is str:
+            # Interned: refs look components up by name many times
+            comp_name = intern(comp_name)
+
+        append(spec(chart=chart, name=comp_name, values=values))
+
+    # Duplicate names: one set build, then locate the first repeat
+    names = [c.name for c in components]
+    if len(set(names)) != len(names):
+        seen_names: set[str] = set()
+        for comp_name in names:
+            if comp_name in seen_names:
+                raise StackParseError(
+                    f"Duplicate component name: '{comp_name}'. "
+                    f"Use 'name' field to distinguish multiple instances of the same chart."
+                )
+            seen_names.add(comp_name)
 
     return StackSpec(
         name=name,
         namespace=namespace,
         components=components,
-        raw=data,
+        raw=MappingProxyType(data),
     )
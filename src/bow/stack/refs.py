@@ -23,13 +23,16 @@ Example:
 
 from __future__ import annotations
 
-import re
+import functools
+import string
+from sys import intern
 from typing import Any
 
 from bow.stack.parser import ComponentSpec
 
 # ${component_name.field} or ${component_name.values.key}
-_REF_PATTERN = re.compile(r"\$\{([a-zA-Z0-9_-]+)\.([a-zA-Z0-9_.]+)\}")
+_NAME_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+_PATH_CHARS = frozenset(string.ascii_letters + string.digits + "_.")
 
 
 def resolve_refs(
@@ -44,11 +47,22 @@ def resolve_refs(
         New ComponentSpec list with resolved references
     """
     # Component lookup tablosu
-    lookup: dict[str, ComponentSpec] = {c.name: c for c in components}
+    lookup: dict[str, ComponentSpec] = {
+        intern(c.name) if type(c.name) is str else c.name: c
+        for c in components
+    }
+    # Field values only depend on the (unresolved) source components,
+    # so each ${component.field} is computed once per stack
+    field_cache: dict[tuple[str, str], str] = {}
+    # Containers without any "${" are reused as-is (keyed by id())
+    ref_memo: dict[int, bool] = {}
 
     resolved: list[ComponentSpec] = []
     for comp in components:
-        new_values = _resolve_dict(comp.values, lookup)
+        if _has_ref(comp.values, ref_memo):
+            new_values = _resolve_dict(comp.values, lookup, field_cache, ref_memo)
+        else:
+            new_values = comp.values
         resolved.append(ComponentSpec(
             chart=comp.chart,
             name=comp.name,
@@ -57,53 +71,118 @@ def resolve_refs(
     return resolved
 
 
-def _resolve_dict(data: dict, lookup: dict[str, ComponentSpec]) -> dict:
+def _resolve_dict(
+    data: dict,
+    lookup: dict[str, ComponentSpec],
+    field_cache: dict[tuple[str, str], str],
+    ref_memo: dict[int, bool],
+) -> dict:
     """Resolve all references in string values within a dict."""
     result = {}
     for key, value in data.items():
         if isinstance(value, str):
-            result[key] = _resolve_string(value, lookup)
+            result[key] = _resolve_string(value, lookup, field_cache)
+        elif not _has_ref(value, ref_memo):
+            result[key] = value
         elif isinstance(value, dict):
-            result[key] = _resolve_dict(value, lookup)
+            result[key] = _resolve_dict(value, lookup, field_cache, ref_memo)
         elif isinstance(value, list):
-            result[key] = _resolve_list(value, lookup)
+            result[key] = _resolve_list(value, lookup, field_cache, ref_memo)
         else:
             result[key] = value
     return result
 
 
-def _resolve_list(data: list, lookup: dict[str, ComponentSpec]) -> list:
+def _resolve_list(
+    data: list,
+    lookup: dict[str, ComponentSpec],
+    field_cache: dict[tuple[str, str], str],
+    ref_memo: dict[int, bool],
+) -> list:
     """Resolve references within a list."""
     result = []
     for item in data:
         if isinstance(item, str):
-            result.append(_resolve_string(item, lookup))
+            result.append(_resolve_string(item, lookup, field_cache))
+        elif not _has_ref(item, ref_memo):
+            result.append(item)
         elif isinstance(item, dict):
-            result.append(_resolve_dict(item, lookup))
+            result.append(_resolve_dict(item, lookup, field_cache, ref_memo))
         elif isinstance(item, list):
-            result.append(_resolve_list(item, lookup))
+            result.append(_resolve_list(item, lookup, field_cache, ref_memo))
         else:
             result.append(item)
     return result
 
 
-def _resolve_string(value: str, lookup: dict[str, ComponentSpec]) -> str:
-    """Resolve ${ref} patterns within a string."""
-
-    def replacer(match: re.Match) -> str:
-        comp_name = match.group(1)
-        field_path = match.group(2)
-
-        if comp_name not in lookup:
-            raise RefError(
-                f"Unknown component reference: '${{{comp_name}.{field_path}}}'. "
-                f"Available components: {list(lookup.keys())}"
-            )
+def _has_ref(value: Any, memo: dict[int, bool]) -> bool:
+    """Whether value (recursively) contains a "${" string.
 
-        comp = lookup[comp_name]
-        return _get_field(comp, field_path)
-
-    return _REF_PATTERN.sub(replacer, value)
+    Results for dicts and lists are memoized by id() in memo, which
+    must not outlive the objects it describes.
+    """
+    if isinstance(value, str):
+        return "${" in value
+    if not isinstance(value, (dict, list)):
+        return False
+
+    key = id(value)
+    found = memo.get(key)
+    if found is None:
+        items = value.values() if isinstance(value, dict) else value
+        found = memo[key] = any(_has_ref(item, memo) for item in items)
+    return found
+
+
+def _resolve_string(
+    value: str,
+    lookup: dict[str, ComponentSpec],
+    field_cache: dict[tuple[str, str], str],
+) -> str:
+    """Resolve ${ref} patterns within a string.
+
+    Scans for "${" / "}" pairs with str.find; a pair whose body is not
+    <component>.<field> is kept literally, like a non-matching regex.
+    """
+    start = value.find("${")
+    if start == -1:
+        return value
+
+    out: list[str] = []
+    pos = 0
+    while start != -1:
+        end = value.find("}", start + 2)
+        if end == -1:
+            break
+
+        comp_name, dot, field_path = value[start + 2:end].partition(".")
+        if not (
+            dot and comp_name and field_path
+            and _NAME_CHARS.issuperset(comp_name)
+            and _PATH_CHARS.issuperset(field_path)
+        ):
+            # Not a reference; a later "${" inside the body may still be
+            start = value.find("${", start + 2)
+            continue
+
+        comp_name = intern(comp_name)  # pointer-equal to parsed names
+        key = (comp_name, field_path)
+        resolved = field_cache.get(key)
+        if resolved is None:
+            if comp_name not in lookup:
+                raise RefError(
+                    f"Unknown component reference: '${{{comp_name}.{field_path}}}'. "
+                    f"Available components: {list(lookup.keys())}"
+                )
+            field_cache[key] = resolved = _get_field(lookup[comp_name], field_path)
+
+        out.append(value[pos:start])
+        out.append(resolved)
+        pos = end + 1
+        start = value.find("${", pos)
+
+    out.append(value[pos:])
+    return "".join(out)
 
 
 def _get_field(comp: ComponentSpec, field_path: str) -> str:
@@ -149,7 +228,7 @@ def _get_field(comp: ComponentSpec, field_path: str) -> str:
 def _get_nested_str(data: dict, path: str) -> str:
     """Get a value from a nested dict using a dot-separated path."""
     current: Any = data
-    for part in path.split("."):
+    for part in _split_path(path):
         if isinstance(current, dict) and part in current:
             current = current[part]
         else:
@@ -157,6 +236,12 @@ def _get_nested_str(data: dict, path: str) -> str:
     return str(current)
 
 
+@functools.lru_cache(maxsize=1024)
+def _split_path(path: str) -> tuple[str, ...]:
+    """Dotted values path → key tuple (the same paths recur across stacks)."""
+    return tuple(path.split("."))
+
+
 class RefError(Exception):
     """Reference resolution error."""
     pass
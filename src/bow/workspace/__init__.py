@@ -2,7 +2,7 @@
 
 from bow.workspace.lock import (
     LockSpec, parse_lock, write_lock,
-    compute_checksum, check_drift, LockError,
+    compute_checksum, check_drift, drift_checksum, LockError,
 )
 from bow.workspace.stage import resolve_stages, resolve_value_files
 from bow.workspace.resolver import (
@@ -11,7 +11,7 @@ from bow.workspace.resolver import (
 
 __all__ = [
     "LockSpec", "parse_lock", "write_lock",
-    "compute_checksum", "check_drift", "LockError",
+    "compute_checksum", "check_drift", "drift_checksum", "LockError",
     "resolve_stages", "resolve_value_files",
     "resolve_workspace", "WorkspacePlan", "WorkspaceError",
 ]
@@ -10,21 +10,37 @@ bow.lock format:
     namespace: t1-postgresql
     checksum: sha256:abc123...   # hash of values + stack files
 
-Checksum: Combined SHA256 hash of values.yaml + values.*.yaml + stack.yaml
-files. Used for change detection.
+Checksum: SHA256 over the per-file SHA256 digests of stack.yaml +
+values.yaml + values.*.yaml. Used for change detection.
+
+bow.lock.stat (sidecar): the checksum plus (name, size, mtime_ns) of
+each hashed file, written by check_drift only after it has hashed the
+files and found them matching. While those stats match, check_drift
+trusts the checksum without re-reading the files. It is a local cache:
+safe to delete, and best left out of version control (.gitignore it
+next to a committed bow.lock).
 """
 
 from __future__ import annotations
 
 import hashlib
+import json
+import mmap
+import os
+import string
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import Any
 
-import yaml
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
 
+from bow.stack._yaml_cache import clear_yaml_cache, load_yaml_cached
 
-@dataclass
+
+@dataclass(slots=True)
 class LockSpec:
     """Parsed bow.lock."""
     chart: str | None = None
@@ -58,11 +74,10 @@ class LockError(Exception):
 def parse_lock(path: str | Path) -> LockSpec:
     """Parse a bow.lock file."""
     p = Path(path)
-    if not p.exists():
-        raise LockError(f"Lock file not found: {p}")
-
-    with open(p) as f:
-        data = yaml.safe_load(f)
+    try:
+        data = load_yaml_cached(p)
+    except FileNotFoundError as e:
+        raise LockError(f"Lock file not found: {p}") from e
 
     if not isinstance(data, dict):
         raise LockError(f"Lock file must be a YAML mapping: {p}")
@@ -88,34 +103,76 @@ def parse_lock(path: str | Path) -> LockSpec:
 
 
 def write_lock(lock: LockSpec, path: str | Path) -> None:
-    """Write a bow.lock file."""
-    data: dict[str, Any] = {
-        "apiVersion": "bow.io/v1",
-        "kind": "Lock",
-    }
+    """Write a bow.lock file.
+
+    The schema is a flat mapping of known scalars, so it is emitted
+    directly instead of going through the PyYAML representer.
+    """
+    fields: list[tuple[str, Any]] = [
+        ("apiVersion", "bow.io/v1"),
+        ("kind", "Lock"),
+    ]
 
     if lock.chart:
-        data["chart"] = lock.chart
+        fields.append(("chart", lock.chart))
     if lock.stack:
-        data["stack"] = lock.stack
+        fields.append(("stack", lock.stack))
     if lock.version:
-        data["version"] = lock.version
+        fields.append(("version", lock.version))
     if lock.namespace:
-        data["namespace"] = lock.namespace
+        fields.append(("namespace", lock.namespace))
     if lock.create_namespace:
-        data["create_namespace"] = True
+        fields.append(("create_namespace", True))
     if lock.checksum:
-        data["checksum"] = lock.checksum
+        fields.append(("checksum", lock.checksum))
     if lock.registry:
-        data["registry"] = lock.registry
+        fields.append(("registry", lock.registry))
     if lock.digest:
-        data["digest"] = lock.digest
+        fields.append(("digest", lock.digest))
 
     with open(path, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        f.write("".join(f"{key}: {_yaml_scalar(value)}\n" for key, value in fields))
+    # Same-size rewrites can land within one mtime tick
+    clear_yaml_cache()
+
 
+_PLAIN_FIRST = frozenset(string.ascii_letters + string.digits + "_./")
+_PLAIN_REST = _PLAIN_FIRST | frozenset("-@:+")
+_RESOLVER = Resolver()
+_STR_TAG = "tag:yaml.org,2002:str"
 
-def compute_checksum(workspace_dir: str | Path) -> str:
+
+def _yaml_scalar(value: Any) -> str:
+    """Render a scalar for bow.lock so that it loads back unchanged.
+
+    Strings stay plain when they only use unambiguous characters and
+    YAML would not read them as another type (16.4, true, null, ...);
+    anything else is double-quoted (JSON string syntax is valid YAML).
+
+    >>> _yaml_scalar("sha256:abc"), _yaml_scalar("16.4"), _yaml_scalar(True)
+    ('sha256:abc', '"16.4"', 'true')
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return json.dumps(value)
+
+    value = str(value)
+    if (
+        value
+        and value[0] in _PLAIN_FIRST
+        and _PLAIN_REST.issuperset(value)
+        and not value.endswith(":")
+        and _RESOLVER.resolve(ScalarNode, value, (True, False)) == _STR_TAG
+    ):
+        return value
+    return json.dumps(value)
+
+
+def compute_checksum(
+    workspace_dir: str | Path,
+    cache: dict[str, tuple[int, int, bytes]] | None = None,
+) -> str:
     """Compute the checksum of all yaml files in the workspace directory.
 
     Included files:
@@ -123,44 +180,163 @@ def compute_checksum(workspace_dir: str | Path) -> str:
     - stack.yaml
     - bow.lock is NOT included (checksum doesn't hash itself)
 
+    Each file's sha256(name + contents) is computed independently (in
+    parallel for several files), then the digests are folded into one
+    sha256 in file order.
+
+    Args:
+        cache: Optional {path: (size, mtime_ns, digest)} map carried
+            between calls; files whose size and mtime are unchanged
+            reuse their digest instead of being re-read.
+
     Returns:
         Hash string in "sha256:<hex>" format
     """
-    ws = Path(workspace_dir)
+    files_to_hash = _checksum_files(Path(workspace_dir))
+    hash_file = _hash_file if cache is None else partial(_cached_hash_file, cache=cache)
+
+    if len(files_to_hash) > 1:
+        workers = min(8, len(files_to_hash))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            digests = list(pool.map(hash_file, files_to_hash))
+    else:
+        digests = [hash_file(fp) for fp in files_to_hash]
+
     hasher = hashlib.sha256()
+    for digest in digests:
+        hasher.update(digest)
+    return f"sha256:{hasher.hexdigest()}"
 
-    # Read files in order (deterministic)
-    files_to_hash: list[Path] = []
 
-    # stack.yaml
-    stack_file = ws / "stack.yaml"
-    if stack_file.exists():
-        files_to_hash.append(stack_file)
+def _checksum_files(ws: Path) -> list[Path]:
+    """Files covered by the checksum, in deterministic order.
 
-    # values.yaml ve values.*.yaml
-    values_main = ws / "values.yaml"
-    if values_main.exists():
-        files_to_hash.append(values_main)
+    One scandir pass: stack.yaml, values.yaml, then values.*.yaml sorted.
+    """
+    try:
+        with os.scandir(ws) as it:
+            names = {entry.name for entry in it if entry.is_file()}
+    except FileNotFoundError:
+        return []
+
+    files_to_hash = [ws / n for n in ("stack.yaml", "values.yaml") if n in names]
+
+    # values.*.yaml ("values." + anything + ".yaml", so never values.yaml)
+    files_to_hash.extend(
+        ws / n for n in sorted(
+            n for n in names
+            if n.startswith("values.") and n.endswith(".yaml") and n != "values.yaml"
+        )
+    )
+    return files_to_hash
 
-    for vf in sorted(ws.glob("values.*.yaml")):
-        files_to_hash.append(vf)
 
-    for fp in files_to_hash:
-        # Include filename in hash (rename detection)
-        hasher.update(fp.name.encode())
-        hasher.update(fp.read_bytes())
+def _hash_file(fp: Path) -> bytes:
+    """sha256 of a file's name + contents (name: rename detection)."""
+    hasher = hashlib.sha256(fp.name.encode())
+    _update_from_file(hasher, fp)
+    return hasher.digest()
+
+
+def _cached_hash_file(fp: Path, cache: dict[str, tuple[int, int, bytes]]) -> bytes:
+    """_hash_file, reusing cache[fp] while the file's size and mtime match."""
+    st = os.stat(fp)
+    key = str(fp)
+    entry = cache.get(key)
+    if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+        return entry[2]
+    digest = _hash_file(fp)
+    cache[key] = (st.st_size, st.st_mtime_ns, digest)
+    return digest
+
 
+def _legacy_checksum(workspace_dir: str | Path) -> str:
+    """Checksum as written by older bow: one sequential sha256 stream."""
+    hasher = hashlib.sha256()
+    for fp in _checksum_files(Path(workspace_dir)):
+        hasher.update(fp.name.encode())
+        _update_from_file(hasher, fp)
     return f"sha256:{hasher.hexdigest()}"
 
 
+def _update_from_file(hasher: Any, path: Path) -> None:
+    """Feed a file's bytes into hasher via mmap (no Python-side copy)."""
+    with open(path, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap can't map empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            hasher.update(mm)
+
+
 def check_drift(workspace_dir: str | Path, lock: LockSpec) -> bool:
     """Check whether files have changed in the workspace.
 
     Returns:
         True = drift detected (files changed), False = clean
     """
+    return drift_checksum(workspace_dir, lock) is not None
+
+
+def drift_checksum(workspace_dir: str | Path, lock: LockSpec) -> str | None:
+    """Like check_drift, but return the current checksum on drift.
+
+    A clean workspace is often confirmed from the bow.lock.stat sidecar
+    without hashing, so callers that only need the checksum to report
+    drift should use this instead of calling compute_checksum again.
+
+    Returns:
+        Current "sha256:<hex>" checksum if drift is detected, else None
+    """
     if not lock.checksum:
-        return False  # Skip drift check if no checksum
+        return None  # Skip drift check if no checksum
 
-    current = compute_checksum(workspace_dir)
-    return current != lock.checksum
+    ws = Path(workspace_dir)
+    sidecar = ws / "bow.lock.stat"
+    # Taken before hashing, so a concurrent edit can't be recorded as clean
+    signature = _stat_signature(ws)
+    if _read_stat_sidecar(sidecar) == (lock.checksum, signature):
+        return None
+
+    current = compute_checksum(ws)
+    if current != lock.checksum:
+        # Locks from before per-file hashing: compare in the old format
+        if _legacy_checksum(ws) != lock.checksum:
+            return current
+
+    _write_stat_sidecar(sidecar, lock.checksum, signature)
+    return None
+
+
+def _stat_signature(ws: Path) -> list[list[Any]]:
+    """[name, size, mtime_ns] of each checksummed file, in checksum order."""
+    signature = []
+    for fp in _checksum_files(ws):
+        st = os.stat(fp)
+        signature.append([fp.name, st.st_size, st.st_mtime_ns])
+    return signature
+
+
+def _read_stat_sidecar(path: Path) -> tuple[str, list[list[Any]]] | None:
+    """(checksum, signature) from a bow.lock.stat file, or None."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data["checksum"], data["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_stat_sidecar(
+    path: Path,
+    checksum: str,
+    signature: list[list[Any]],
+) -> None:
+    """Record a verified checksum + the file stats taken before hashing.
+
+    Best effort (it is only a cache).
+    """
+    try:
+        with open(path, "w") as f:
+            json.dump({"checksum": checksum, "files": signature}, f)
+    except OSError:
+        pass
@@ -20,13 +20,13 @@ from bow.workspace.stage import (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkspacePlan:
     """Resolved workspace deploy plan."""
     workspace_dir: Path
     lock: LockSpec
     stages: list[str]
-    files: list[str]           # files to pass to deploy/template
+    files: list[Path]          # files to pass to deploy/template
     set_args: list[str] = field(default_factory=list)
     has_drift: bool = False    # whether checksum has changed
 
@@ -82,9 +82,9 @@ def resolve_workspace(
     # 3. Collect files
     if lock.is_stack:
         files = resolve_stack_files(ws, stages, extra_files)
-        # stack.yaml required
+        # stack.yaml required (already seen by the directory scan if present)
         stack_file = ws / "stack.yaml"
-        if not stack_file.exists():
+        if not files or files[0] != stack_file:
             # Lock has stack reference but file not found
             stack_name = lock.stack or "stack.yaml"
             stack_file = ws / stack_name
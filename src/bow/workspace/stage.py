@@ -17,6 +17,8 @@ from __future__ import annotations
 import os
 from pathlib import Path
 
+import click
+
 
 def resolve_stages(
     flag_stages: list[str] | tuple[str, ...] | None = None,
@@ -46,7 +48,7 @@ def resolve_value_files(
     workspace_dir: str | Path,
     stages: list[str],
     extra_files: list[str] | None = None,
-) -> list[str]:
+) -> list[Path]:
     """Resolve values files from workspace directory based on stage.
 
     File order (low to high precedence):
@@ -60,41 +62,16 @@ def resolve_value_files(
         extra_files: Additional -f files
 
     Returns:
-        List of file paths (existing ones only)
+        List of file paths (existing ones only; extra files as given)
     """
-    ws = Path(workspace_dir)
-    files: list[str] = []
-
-    # 1. Base values
-    base = ws / "values.yaml"
-    if base.exists():
-        files.append(str(base))
-
-    # 2. Stage overlays
-    for stage in stages:
-        stage_file = ws / f"values.{stage}.yaml"
-        if stage_file.exists():
-            files.append(str(stage_file))
-        else:
-            # Stage file not found — warning, not error
-            import click
-            click.echo(
-                f"Warning: Stage file not found: {stage_file}",
-                err=True,
-            )
-
-    # 3. Extra files
-    if extra_files:
-        files.extend(extra_files)
-
-    return files
+    return _collect(Path(workspace_dir), stages, extra_files, include_stack=False)
 
 
 def resolve_stack_files(
     workspace_dir: str | Path,
     stages: list[str],
     extra_files: list[str] | None = None,
-) -> list[str]:
+) -> list[Path]:
     """Resolve file list for a stack workspace.
 
     File order:
@@ -106,16 +83,51 @@ def resolve_stack_files(
     Returns:
         List of file paths
     """
-    ws = Path(workspace_dir)
-    files: list[str] = []
+    return _collect(Path(workspace_dir), stages, extra_files, include_stack=True)
 
-    # 1. Stack file
-    stack_file = ws / "stack.yaml"
-    if stack_file.exists():
-        files.append(str(stack_file))
 
-    # 2-4. Values (stage dahil)
-    value_files = resolve_value_files(ws, stages, extra_files)
-    files.extend(value_files)
+def _collect(
+    ws: Path,
+    stages: list[str],
+    extra_files: list[str] | None,
+    include_stack: bool,
+) -> list[Path]:
+    """Build the ordered file list from a single scan of ws.
+
+    Presence is checked against one os.scandir listing (regular files
+    only) instead of a stat per candidate.
+    """
+    try:
+        with os.scandir(ws) as it:
+            present = {entry.name for entry in it if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        present = set()
+
+    files: list[Path] = []
+
+    # 0. Stack file
+    if include_stack and "stack.yaml" in present:
+        files.append(ws / "stack.yaml")
+
+    # 1. Base values
+    if "values.yaml" in present:
+        files.append(ws / "values.yaml")
+
+    # 2. Stage overlays
+    for stage in stages:
+        fname = f"values.{stage}.yaml"
+        stage_file = ws / fname
+        if fname in present:
+            files.append(stage_file)
+        else:
+            # Stage file not found — warning, not error
+            click.echo(
+                f"Warning: Stage file not found: {stage_file}",
+                err=True,
+            )
+
+    # 3. Extra files
+    if extra_files:
+        files.extend(map(Path, extra_files))
 
     return files
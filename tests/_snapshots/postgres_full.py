@@ -0,0 +1,195 @@
+"""
+tests/_snapshots/postgres_full.py — Snapshot of TestFullStack's manifest.
+
+to_dicts() output of the pg_full fixture in test_core.py. Regenerate by
+printing the fixture's docs when the rendered shape changes on purpose.
+"""
+
+EXPECTED_DOCS = [
+    {
+        "apiVersion": "v1",
+        "kind": "Secret",
+        "metadata": {
+            "name": "pg-credentials",
+        },
+        "type": "Opaque",
+        "data": {
+            "POSTGRES_USER": "YWRtaW4=",
+            "POSTGRES_PASSWORD": "czNjcmV0",
+        },
+    },
+    {
+        "apiVersion": "v1",
+        "kind": "ConfigMap",
+        "metadata": {
+            "name": "pg-config",
+        },
+        "data": {
+            "POSTGRES_DB": "appdb",
+            "PGDATA": "/var/lib/postgresql/data/pgdata",
+        },
+    },
+    {
+        "apiVersion": "v1",
+        "kind": "PersistentVolumeClaim",
+        "metadata": {
+            "name": "pgdata",
+        },
+        "spec": {
+            "accessModes": [
+                "ReadWriteOnce",
+            ],
+            "resources": {
+                "requests": {
+                    "storage": "50Gi",
+                },
+            },
+        },
+    },
+    {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {
+            "name": "postgresql",
+            "labels": {
+                "app": "postgresql",
+            },
+        },
+        "spec": {
+            "replicas": 1,
+            "selector": {
+                "matchLabels": {
+                    "app": "postgresql",
+                },
+            },
+            "template": {
+                "metadata": {
+                    "labels": {
+                        "app": "postgresql",
+                    },
+                },
+                "spec": {
+                    "containers": [
+                        {
+                            "name": "postgresql",
+                            "image": "postgres:16",
+                            "ports": [
+                                {
+                                    "containerPort": 5432,
+                                    "protocol": "TCP",
+                                    "name": "pg",
+                                },
+                            ],
+                            "env": [
+                                {
+                                    "name": "POSTGRES_DB",
+                                    "valueFrom": {
+                                        "configMapKeyRef": {
+                                            "name": "pg-config",
+                                            "key": "POSTGRES_DB",
+                                        },
+                                    },
+                                },
+                                {
+                                    "name": "POSTGRES_USER",
+                                    "valueFrom": {
+                                        "secretKeyRef": {
+                                            "name": "pg-credentials",
+                                            "key": "POSTGRES_USER",
+                                        },
+                                    },
+                                },
+                                {
+                                    "name": "POSTGRES_PASSWORD",
+                                    "valueFrom": {
+                                        "secretKeyRef": {
+                                            "name": "pg-credentials",
+                                            "key": "POSTGRES_PASSWORD",
+                                        },
+                                    },
+                                },
+                            ],
+                            "resources": {
+                                "requests": {
+                                    "cpu": "250m",
+                                    "memory": "256Mi",
+                                },
+                                "limits": {
+                                    "cpu": "500m",
+                                    "memory": "512Mi",
+                                },
+                            },
+                            "volumeMounts": [
+                                {
+                                    "name": "pgdata",
+                                    "mountPath": "/var/lib/postgresql/data",
+                                },
+                            ],
+                            "livenessProbe": {
+                                "initialDelaySeconds": 30,
+                                "periodSeconds": 10,
+                                "timeoutSeconds": 1,
+                                "failureThreshold": 3,
+                                "tcpSocket": {
+                                    "port": 5432,
+                                },
+                            },
+                            "readinessProbe": {
+                                "initialDelaySeconds": 5,
+                                "periodSeconds": 5,
+                                "timeoutSeconds": 1,
+                                "failureThreshold": 3,
+                                "exec": {
+                                    "command": [
+                                        "pg_isready",
+                                        "-U",
+                                        "admin",
+                                    ],
+                                },
+                            },
+                        },
+                    ],
+                    "volumes": [
+                        {
+                            "name": "config",
+                            "configMap": {
+                                "name": "pg-config",
+                            },
+                        },
+                        {
+                            "name": "creds",
+                            "secret": {
+                                "secretName": "pg-credentials",
+                            },
+                        },
+                        {
+                            "name": "pgdata",
+                            "persistentVolumeClaim": {
+                                "claimName": "pgdata",
+                            },
+                        },
+                    ],
+                },
+            },
+        },
+    },
+    {
+        "apiVersion": "v1",
+        "kind": "Service",
+        "metadata": {
+            "name": "postgresql",
+        },
+        "spec": {
+            "type": "ClusterIP",
+            "selector": {
+                "app": "postgresql",
+            },
+            "ports": [
+                {
+                    "port": 5432,
+                    "targetPort": 5432,
+                },
+            ],
+        },
+    },
+]
@@ -0,0 +1,158 @@
+"""
+tests/conftest.py — Shared fixtures.
+
+The example charts are registered (and entry_points discovered) once per
+session; each test that uses the registry gets it restored from that
+snapshot instead of re-registering and re-discovering.
+"""
+
+import json
+from functools import lru_cache, partial
+from importlib import import_module
+from pathlib import Path
+
+import pytest
+import yaml
+
+from bow._yaml import SafeLoader
+from bow.chart import registry
+from bow.core.resource import _reset_tracking
+from bow.core.stack import _reset
+
+
+# YAML helpers shared by the test modules. Fixture files are written as
+# JSON: it is valid YAML, so every loader under test reads it unchanged,
+# and the C json encoder is far cheaper than any YAML dumper.
+load_all_yaml = partial(yaml.load_all, Loader=SafeLoader)
+
+
+def write_yaml_file(path, data) -> None:
+    """Write a YAML fixture file: text as-is, anything else as JSON."""
+    Path(path).write_bytes((data if isinstance(data, str) else json.dumps(data)).encode())
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow", action="store_true", default=False,
+        help="also run tests marked slow (real venv/pip installs)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow; pass --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+def _restore_registry(snapshot: dict) -> None:
+    registry._registry.clear()
+    registry._registry.update(snapshot)
+    registry._discovered = True
+
+
+# Example charts the suite renders: name -> (module, class)
+_EXAMPLE_CHARTS = {
+    "postgresql": ("bow_postgresql", "PostgreSQLChart"),
+    "redis": ("bow_redis", "RedisChart"),
+    "redmine": ("bow_redmine", "RedmineChart"),
+}
+
+
+@pytest.fixture(scope="session")
+def chart_registry():
+    """Registry contents with the example charts registered.
+
+    Charts installed under the bow.charts entry_points group come from
+    discovery (once per session); only examples it did not provide are
+    imported and registered by hand.
+    """
+    registry.reset_registry()
+    found = registry.list_charts()  # entry_points discovery, once
+    missing = [
+        getattr(import_module(module), cls_name)
+        for name, (module, cls_name) in _EXAMPLE_CHARTS.items()
+        if name not in found
+    ]
+    if missing:
+        registry.register_charts(missing)
+    snapshot = registry._registry.copy()
+    yield snapshot
+    registry.reset_registry()
+
+
+@pytest.fixture
+def charts(chart_registry):
+    """Registry restored to the session snapshot for a test.
+
+    Restored on setup only: every test that reads the registry requests
+    this fixture (or resets it itself), so leftovers never leak into one.
+    """
+    _restore_registry(chart_registry)
+
+
+@pytest.fixture
+def clean_stack():
+    """Start a test with an empty resource stack and no tracking labels.
+
+    Chart.template() leaves its bow.io/* labels set for the context, so
+    they are cleared here too. Every test that builds resources resets
+    on setup, so no per-test teardown reset is needed; _final_stack_reset
+    clears it once at exit.
+    """
+    _reset()
+    _reset_tracking()
+
+
+@pytest.fixture
+def clean_charts(charts, clean_stack):
+    """Session chart registry plus an empty resource stack."""
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _final_stack_reset():
+    yield
+    _reset()
+    _reset_tracking()
+
+
+@pytest.fixture(scope="session")
+def render(chart_registry):
+    """Session-cached render: render(name, *set_args) -> docs (read-only).
+
+    Keyed on the immutable inputs, so each distinct chart/--set combination
+    is templated once per session. Callers must not mutate the docs.
+    """
+    @lru_cache(maxsize=64)
+    def _render(name: str, *set_args: str) -> tuple[dict, ...]:
+        chart = chart_registry[name]()
+        return tuple(chart.template(set_args=list(set_args)).to_dicts())
+    return _render
+
+
+def _by_kind(docs: list[dict]) -> dict[str, list[dict]]:
+    """Group rendered documents by kind in one pass (render order kept)."""
+    grouped: dict[str, list[dict]] = {}
+    for doc in docs:
+        grouped.setdefault(doc["kind"], []).append(doc)
+    return grouped
+
+
+@pytest.fixture
+def by_kind():
+    """The _by_kind helper: by_kind(m.to_dicts())["Deployment"][0]."""
+    return _by_kind
+
+
+def _assert_subset(sub: dict, full: dict) -> None:
+    """Assert every key of sub is in full with an equal value (one report)."""
+    diff = {k: (v, full.get(k)) for k, v in sub.items() if full.get(k, ...) != v}
+    assert not diff, f"mismatched keys (expected, actual): {diff}"
+
+
+@pytest.fixture
+def assert_subset():
+    """The _assert_subset helper: assert_subset({"type": "NodePort"}, spec)."""
+    return _assert_subset
@@ -4,29 +4,19 @@ tests/test_chart.py — Chart system tests.
 Values merge, chart render, registry, dependency.
 """
 
-import os
-import sys
-import yaml
+import json
 import pytest
-import tempfile
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
-
-from bow.core.stack import _reset
+from bow.chart.base import Chart
 from bow.chart.values import deep_merge, parse_set_values, merge_all_values
-from bow.chart.registry import register_chart, get_chart, list_charts, reset_registry
+from bow.chart.registry import get_chart, list_charts, register_charts
 from bow.chart.dependency import ChartDep, resolve_condition, get_dep_values
-from bow_postgresql import PostgreSQLChart
+
+from conftest import write_yaml_file
 
 
-@pytest.fixture(autouse=True)
-def clean():
-    _reset()
-    reset_registry()
-    register_chart(PostgreSQLChart)
-    yield
-    _reset()
-    reset_registry()
+# Payload shared by several values-file tests, serialized once at import
+_REPLICAS_5 = json.dumps({"replicas": 5}).encode()
 
 
 # ─────────────────────────────────────────────
@@ -90,42 +80,34 @@ class TestParseSetValues:
 
 
 class TestMergeAllValues:
-    def test_with_file(self):
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump({"replicas": 5, "storage": "100Gi"}, f)
-            f.flush()
-            result = merge_all_values(
-                {"replicas": 1, "storage": "10Gi", "database": "appdb"},
-                [f.name],
-                [],
-            )
-        os.unlink(f.name)
+    def test_with_file(self, tmp_path):
+        values = tmp_path / "values.yaml"
+        write_yaml_file(values, {"replicas": 5, "storage": "100Gi"})
+        result = merge_all_values(
+            {"replicas": 1, "storage": "10Gi", "database": "appdb"},
+            [str(values)],
+            [],
+        )
         assert result["replicas"] == 5
         assert result["storage"] == "100Gi"
         assert result["database"] == "appdb"  # default preserved
 
-    def test_set_overrides_file(self):
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump({"replicas": 5}, f)
-            f.flush()
-            result = merge_all_values(
-                {"replicas": 1},
-                [f.name],
-                ["replicas=10"],
-            )
-        os.unlink(f.name)
+    def test_set_overrides_file(self, tmp_path):
+        values = tmp_path / "values.yaml"
+        values.write_bytes(_REPLICAS_5)
+        result = merge_all_values(
+            {"replicas": 1},
+            [str(values)],
+            ["replicas=10"],
+        )
         assert result["replicas"] == 10  # --set wins
 
-    def test_multiple_files(self):
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f1:
-            yaml.dump({"replicas": 3, "storage": "50Gi"}, f1)
-            f1.flush()
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f2:
-            yaml.dump({"replicas": 5}, f2)
-            f2.flush()
-            result = merge_all_values({}, [f1.name, f2.name], [])
-        os.unlink(f1.name)
-        os.unlink(f2.name)
+    def test_multiple_files(self, tmp_path):
+        f1 = tmp_path / "values.yaml"
+        write_yaml_file(f1, {"replicas": 3, "storage": "50Gi"})
+        f2 = tmp_path / "values.prod.yaml"
+        f2.write_bytes(_REPLICAS_5)
+        result = merge_all_values({}, [str(f1), str(f2)], [])
         assert result["replicas"] == 5    # second file wins
         assert result["storage"] == "50Gi"  # preserved from first file
 
@@ -137,6 +119,7 @@ class TestMergeAllValues:
 # ─────────────────────────────────────────────
 # REGISTRY
 # ─────────────────────────────────────────────
+@pytest.mark.usefixtures("clean_charts")
 class TestRegistry:
     def test_register_and_get(self):
         chart = get_chart("postgresql")
@@ -152,6 +135,18 @@ class TestRegistry:
         charts = list_charts()
         assert "postgresql" in charts
 
+    def test_register_charts_batch(self):
+        class AChart(Chart):
+            name = "a-chart"
+
+        class BChart(Chart):
+            name = "b-chart"
+
+        register_charts([AChart, BChart])
+        charts = list_charts()
+        assert charts["a-chart"] is AChart
+        assert charts["b-chart"] is BChart
+
 
 # ─────────────────────────────────────────────
 # DEPENDENCY
@@ -181,43 +176,41 @@ class TestDependency:
 # ─────────────────────────────────────────────
 # CHART TEMPLATE
 # ─────────────────────────────────────────────
+@pytest.fixture(scope="class")
+def default_pg(chart_registry):
+    """postgresql rendered with defaults, once per class (read-only)."""
+    return chart_registry["postgresql"]().template()
+
+
+@pytest.mark.usefixtures("clean_charts")
 class TestChartTemplate:
-    def test_postgresql_default(self):
-        chart = get_chart("postgresql")
-        m = chart.template()
-        docs = m.to_dicts()
-        kinds = [d["kind"] for d in docs]
-        assert "PersistentVolumeClaim" in kinds
-        assert "Deployment" in kinds
-        assert "Service" in kinds
-
-    def test_postgresql_override_replicas(self):
+    def test_postgresql_default(self, default_pg):
+        kinds = {d["kind"] for d in default_pg.to_dicts()}
+        assert {"PersistentVolumeClaim", "Deployment", "Service"} <= kinds
+
+    @pytest.mark.parametrize("set_args,kind,path,expected", [
+        (["replicas=3"], "Deployment", ("spec", "replicas"), 3),
+        (["storage=100Gi"], "PersistentVolumeClaim",
+         ("spec", "resources", "requests", "storage"), "100Gi"),
+    ], ids=["replicas", "storage"])
+    def test_postgresql_override(self, render, by_kind, set_args, kind, path, expected):
+        node = by_kind(render("postgresql", *set_args))[kind][0]
+        for key in path:
+            node = node[key]
+        assert node == expected
+
+    def test_postgresql_with_values_file(self, tmp_path, by_kind):
+        values = tmp_path / "values.yaml"
+        write_yaml_file(values, {
+            "replicas": 2,
+            "storage": "50Gi",
+            "database": "mydb",
+            "metrics": {"enabled": True},
+        })
         chart = get_chart("postgresql")
-        m = chart.template(set_args=["replicas=3"])
-        dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
-        assert dep["spec"]["replicas"] == 3
+        m = chart.template(value_files=[str(values)])
 
-    def test_postgresql_override_storage(self):
-        chart = get_chart("postgresql")
-        m = chart.template(set_args=["storage=100Gi"])
-        pvc = [d for d in m.to_dicts() if d["kind"] == "PersistentVolumeClaim"][0]
-        assert pvc["spec"]["resources"]["requests"]["storage"] == "100Gi"
-
-    def test_postgresql_with_values_file(self):
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump({
-                "replicas": 2,
-                "storage": "50Gi",
-                "database": "mydb",
-                "metrics": {"enabled": True},
-            }, f)
-            f.flush()
-            chart = get_chart("postgresql")
-            m = chart.template(value_files=[f.name])
-        os.unlink(f.name)
-
-        docs = m.to_dicts()
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
+        dep = by_kind(m.to_dicts())["Deployment"][0]
         assert dep["spec"]["replicas"] == 2
 
         # Metrics sidecar container eklenmeli
@@ -225,18 +218,14 @@ class TestChartTemplate:
         assert len(containers) == 2
         assert containers[1]["name"] == "exporter"
 
-    def test_postgresql_yaml_output(self):
-        chart = get_chart("postgresql")
-        m = chart.template()
-        yaml_str = m.to_yaml()
-        # Valid multi-document YAML
-        docs = list(yaml.safe_load_all(yaml_str))
+    def test_postgresql_documents(self, default_pg):
+        # YAML round-trip is covered once in test_core; check the dicts here
+        docs = default_pg.to_dicts()
         assert len(docs) >= 3
+        assert all(d["apiVersion"] and d["metadata"]["name"] for d in docs)
 
-    def test_postgresql_tracking_labels(self):
-        chart = get_chart("postgresql")
-        m = chart.template()
-        dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
+    def test_postgresql_tracking_labels(self, default_pg):
+        dep = next(d for d in default_pg.to_dicts() if d["kind"] == "Deployment")
         labels = dep["metadata"]["labels"]
         assert labels["bow.io/managed-by"] == "bow"
         assert labels["bow.io/chart"] == "postgresql"
@@ -4,18 +4,11 @@ tests/test_charts.py — Chart tests.
 Redis, Redmine charts and component composition.
 """
 
-import os
-import sys
-import yaml
 import pytest
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
-
-from bow.core.stack import _reset
-from bow.chart.registry import register_chart, get_chart, reset_registry
-from bow_postgresql import PostgreSQLChart, pg_container, pg_service
-from bow_redis import RedisChart, redis_container
-from bow_redmine import RedmineChart, redmine_container, redmine_ingress
+from bow_postgresql import pg_container, pg_service
+from bow_redis import redis_container
+from bow_redmine import redmine_container, redmine_ingress
 from bow.core.manifest import manifest
 from bow.core.resources import (
     Deployment, Container, Service, Ingress,
@@ -23,60 +16,51 @@ from bow.core.resources import (
 )
 
 
-@pytest.fixture(autouse=True)
-def clean():
-    _reset()
-    reset_registry()
-    register_chart(PostgreSQLChart)
-    register_chart(RedisChart)
-    register_chart(RedmineChart)
-    yield
-    _reset()
-    reset_registry()
+pytestmark = pytest.mark.usefixtures("clean_charts")
 
 
 # ─────────────────────────────────────────────
 # REDIS CHART
 # ─────────────────────────────────────────────
+@pytest.fixture(scope="class")
+def default_redis(chart_registry):
+    """redis rendered with defaults, once per class (read-only)."""
+    return chart_registry["redis"]().template()
+
+
+@pytest.fixture(scope="class")
+def default_redmine(chart_registry):
+    """redmine rendered with defaults, once per class (read-only)."""
+    return chart_registry["redmine"]().template()
+
+
 class TestRedisChart:
-    def test_default_render(self):
-        chart = get_chart("redis")
-        m = chart.template()
-        docs = m.to_dicts()
-        kinds = [d["kind"] for d in docs]
-        assert "Deployment" in kinds
-        assert "PersistentVolumeClaim" in kinds
-        assert "Service" in kinds
+    def test_default_render(self, default_redis):
+        kinds = {d["kind"] for d in default_redis.to_dicts()}
+        assert {"Deployment", "PersistentVolumeClaim", "Service"} <= kinds
 
-    def test_redis_container(self):
-        chart = get_chart("redis")
-        m = chart.template()
-        dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
+    def test_redis_container(self, default_redis):
+        dep = next(d for d in default_redis.to_dicts() if d["kind"] == "Deployment")
         c = dep["spec"]["template"]["spec"]["containers"][0]
         assert c["image"] == "redis:7"
         assert any(p["containerPort"] == 6379 for p in c["ports"])
         assert "livenessProbe" in c
         assert "readinessProbe" in c
 
-    def test_redis_custom_version(self):
-        chart = get_chart("redis")
-        m = chart.template(set_args=["version=6"])
-        dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
+    def test_redis_custom_version(self, render):
+        dep = next(d for d in render("redis", "version=6") if d["kind"] == "Deployment")
         c = dep["spec"]["template"]["spec"]["containers"][0]
         assert c["image"] == "redis:6"
 
-    def test_redis_with_password(self):
-        chart = get_chart("redis")
-        m = chart.template(set_args=["password_secret=redis-pass"])
-        dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
+    def test_redis_with_password(self, render):
+        docs = render("redis", "password_secret=redis-pass")
+        dep = next(d for d in docs if d["kind"] == "Deployment")
         c = dep["spec"]["template"]["spec"]["containers"][0]
         env_names = [e["name"] for e in c.get("env", [])]
         assert "REDIS_PASSWORD" in env_names
 
-    def test_redis_no_persistence(self):
-        chart = get_chart("redis")
-        m = chart.template(set_args=["persistence.enabled=false"])
-        kinds = [d["kind"] for d in m.to_dicts()]
+    def test_redis_no_persistence(self, render):
+        kinds = {d["kind"] for d in render("redis", "persistence.enabled=false")}
         assert "PersistentVolumeClaim" not in kinds
 
 
@@ -84,60 +68,48 @@ class TestRedisChart:
 # REDMINE CHART
 # ─────────────────────────────────────────────
 class TestRedmineChart:
-    def test_default_render(self):
-        chart = get_chart("redmine")
-        m = chart.template()
-        docs = m.to_dicts()
-        kinds = [d["kind"] for d in docs]
+    def test_default_render(self, default_redmine, by_kind):
+        kinds = by_kind(default_redmine.to_dicts())
         # PostgreSQL dependency + Redmine
-        assert kinds.count("Deployment") == 2  # pg + redmine
+        assert len(kinds["Deployment"]) == 2  # pg + redmine
         assert "Service" in kinds
 
-    def test_redmine_container_env(self):
-        chart = get_chart("redmine")
-        m = chart.template()
-        deps = [d for d in m.to_dicts() if d["kind"] == "Deployment"]
+    def test_redmine_container_env(self, default_redmine, by_kind):
+        deps = by_kind(default_redmine.to_dicts())["Deployment"]
         # Redmine deployment (the second one)
-        redmine_dep = [d for d in deps
-                       if d["metadata"]["name"] == "redmine"][0]
+        redmine_dep = next(d for d in deps
+                           if d["metadata"]["name"] == "redmine")
         c = redmine_dep["spec"]["template"]["spec"]["containers"][0]
         env_names = [e["name"] for e in c["env"]]
         assert "REDMINE_DB_POSTGRES" in env_names
         assert "REDMINE_DB_DATABASE" in env_names
 
-    def test_redmine_disable_postgresql(self):
-        chart = get_chart("redmine")
-        m = chart.template(set_args=["postgresql.enabled=false"])
-        deps = [d for d in m.to_dicts() if d["kind"] == "Deployment"]
+    def test_redmine_disable_postgresql(self, render, by_kind):
+        deps = by_kind(render("redmine", "postgresql.enabled=false"))["Deployment"]
         # Only redmine, postgresql dependency skipped
         assert len(deps) == 1
         assert deps[0]["metadata"]["name"] == "redmine"
 
-    def test_redmine_with_ingress(self):
-        chart = get_chart("redmine")
-        m = chart.template(set_args=[
+    def test_redmine_with_ingress(self, render):
+        docs = render(
+            "redmine",
             "ingress.enabled=true",
             "ingress.host=redmine.example.com",
             "ingress.tls=true",
-        ])
-        docs = m.to_dicts()
+        )
         ingresses = [d for d in docs if d["kind"] == "Ingress"]
         assert len(ingresses) == 1
         ing = ingresses[0]
         assert ing["spec"]["tls"][0]["hosts"] == ["redmine.example.com"]
 
-    def test_redmine_without_ingress(self):
-        chart = get_chart("redmine")
-        m = chart.template()
-        kinds = [d["kind"] for d in m.to_dicts()]
+    def test_redmine_without_ingress(self, default_redmine):
+        kinds = {d["kind"] for d in default_redmine.to_dicts()}
         assert "Ingress" not in kinds
 
-    def test_redmine_yaml_valid(self):
-        chart = get_chart("redmine")
-        m = chart.template()
-        yaml_str = m.to_yaml()
-        docs = list(yaml.safe_load_all(yaml_str))
+    def test_redmine_documents(self, default_redmine):
+        docs = default_redmine.to_dicts()
         assert len(docs) >= 4  # pg pvc + pg dep + pg svc + redmine pvc + redmine dep + redmine svc
+        assert all(d["apiVersion"] and d["metadata"]["name"] for d in docs)
 
 
 # ─────────────────────────────────────────────
@@ -220,7 +192,7 @@ class TestComponentComposition:
                     pass
 
         docs = m.to_dicts()
-        svc = [d for d in docs if d["kind"] == "Service"][0]
+        svc = next(d for d in docs if d["kind"] == "Service")
         assert len(svc["spec"]["ports"]) == 2
         port_names = [p.get("name") for p in svc["spec"]["ports"]]
         assert "pg" in port_names
@@ -4,65 +4,52 @@ tests/test_cli.py — CLI tests.
 Tests commands using Click CliRunner.
 """
 
-import os
-import sys
-import yaml
 import pytest
-import tempfile
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from click.testing import CliRunner
 
-from bow.core.stack import _reset
-from bow.chart.registry import register_chart, reset_registry
-from bow_postgresql import PostgreSQLChart
 from bow.cli import main
 
+from conftest import load_all_yaml, write_yaml_file
+
 
-@pytest.fixture(autouse=True)
-def clean():
-    _reset()
-    reset_registry()
-    register_chart(PostgreSQLChart)
-    yield
-    _reset()
-    reset_registry()
+pytestmark = pytest.mark.usefixtures("clean_charts")
 
 
 runner = CliRunner()
 
 
+def _invoke_ok(args: list[str]):
+    """Happy-path invoke: skip standalone exit handling, let errors raise."""
+    return runner.invoke(main, args, standalone_mode=False, catch_exceptions=False)
+
+
 class TestTemplate:
     def test_template_default(self):
-        result = runner.invoke(main, ["template", "postgresql"])
+        result = _invoke_ok(["template", "postgresql"])
         assert result.exit_code == 0
         assert "kind: Deployment" in result.output
         assert "kind: Service" in result.output
 
     def test_template_with_set(self):
-        result = runner.invoke(main, [
+        result = _invoke_ok([
             "template", "postgresql",
             "--set", "replicas=5",
             "--set", "storage=100Gi",
         ])
         assert result.exit_code == 0
-        docs = list(yaml.safe_load_all(result.output))
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
+        dep = next(d for d in load_all_yaml(result.output) if d["kind"] == "Deployment")
         assert dep["spec"]["replicas"] == 5
 
-    def test_template_with_values_file(self):
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump({"replicas": 7, "database": "testdb"}, f)
-            f.flush()
-            result = runner.invoke(main, [
-                "template", "postgresql",
-                "-f", f.name,
-            ])
-        os.unlink(f.name)
+    def test_template_with_values_file(self, tmp_path):
+        values = tmp_path / "values.yaml"
+        write_yaml_file(values, {"replicas": 7, "database": "testdb"})
+        result = _invoke_ok([
+            "template", "postgresql",
+            "-f", str(values),
+        ])
         assert result.exit_code == 0
-        docs = list(yaml.safe_load_all(result.output))
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
+        dep = next(d for d in load_all_yaml(result.output) if d["kind"] == "Deployment")
         assert dep["spec"]["replicas"] == 7
 
     def test_template_chart_not_found(self):
@@ -70,30 +57,27 @@ class TestTemplate:
         assert result.exit_code != 0
         assert "not found" in result.output or "not found" in (result.output + str(result.exception or ""))
 
-    def test_template_to_file(self):
-        with tempfile.NamedTemporaryFile(suffix=".yaml", delete=False) as f:
-            outpath = f.name
-        result = runner.invoke(main, [
+    def test_template_to_file(self, tmp_path):
+        outpath = tmp_path / "out.yaml"
+        result = _invoke_ok([
             "template", "postgresql",
-            "-o", outpath,
+            "-o", str(outpath),
         ])
         assert result.exit_code == 0
-        with open(outpath) as f:
-            content = f.read()
-        os.unlink(outpath)
+        content = outpath.read_text()
         assert "kind: Deployment" in content
 
 
 class TestList:
     def test_list_charts(self):
-        result = runner.invoke(main, ["list"])
+        result = _invoke_ok(["list"])
         assert result.exit_code == 0
         assert "postgresql" in result.output
 
 
 class TestInspect:
     def test_inspect_chart(self):
-        result = runner.invoke(main, ["inspect", "postgresql"])
+        result = _invoke_ok(["inspect", "postgresql"])
         assert result.exit_code == 0
         assert "postgresql" in result.output
         assert "16.4.0" in result.output
@@ -5,15 +5,13 @@ Tests all resources and context manager behaviors
 of the core module.
 """
 
-import yaml
+import asyncio
+import base64
 import pytest
-import sys
-import os
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from bow.core.stack import _reset
-from bow.core.manifest import manifest
+from bow.core.manifest import manifest, _dump_docs
+from bow.core.resource import _reset_tracking, set_tracking
 from bow.core.resources import (
     Namespace, Deployment, StatefulSet, CronJob,
     Container, Service, ServicePort, ConfigMap, Secret,
@@ -23,20 +21,21 @@ from bow.core.resources import (
     EmptyDirVolume, ConfigMapVolume, SecretVolume,
 )
 
+from _snapshots.postgres_full import EXPECTED_DOCS
+from conftest import load_all_yaml
+
+
+_S3CRET_B64 = base64.b64encode(b"s3cret").decode()
 
-@pytest.fixture(autouse=True)
-def clean_stack():
-    """Clean the stack before each test."""
-    _reset()
-    yield
-    _reset()
+
+pytestmark = pytest.mark.usefixtures("clean_stack")
 
 
 # ─────────────────────────────────────────────
 # BASIC DEPLOYMENT
 # ─────────────────────────────────────────────
 class TestDeployment:
-    def test_simple_deployment(self):
+    def test_simple_deployment(self, assert_subset):
         with manifest() as m:
             with Deployment("nginx"):
                 with Container("nginx", image="nginx:latest"):
@@ -50,8 +49,7 @@ class TestDeployment:
         assert dep["spec"]["replicas"] == 1
         containers = dep["spec"]["template"]["spec"]["containers"]
         assert len(containers) == 1
-        assert containers[0]["name"] == "nginx"
-        assert containers[0]["image"] == "nginx:latest"
+        assert_subset({"name": "nginx", "image": "nginx:latest"}, containers[0])
         assert containers[0]["ports"][0]["containerPort"] == 80
 
     def test_deployment_with_replicas(self):
@@ -89,90 +87,111 @@ class TestDeployment:
         assert docs[0]["kind"] == "PersistentVolumeClaim"
         assert docs[0]["spec"]["resources"]["requests"]["storage"] == "50Gi"
         # Deployment volumes
-        dep = docs[1]
-        assert len(dep["spec"]["template"]["spec"]["volumes"]) == 1
-        assert dep["spec"]["template"]["spec"]["volumes"][0]["name"] == "pgdata"
+        volumes = docs[1]["spec"]["template"]["spec"]["volumes"]
+        assert len(volumes) == 1
+        assert volumes[0]["name"] == "pgdata"
 
 
 # ─────────────────────────────────────────────
 # CONTAINER DETAILS
 # ─────────────────────────────────────────────
-class TestContainer:
-    def test_envvar_plain(self):
-        with manifest() as m:
-            with Deployment("app"):
-                with Container("app", image="app:v1"):
-                    EnvVar("DB_HOST", "localhost")
-                    EnvVar("DB_PORT", "5432")
+# Expected sub-trees for the app_containers cases (built once at import)
+_ENV_PLAIN = [
+    {"name": "DB_HOST", "value": "localhost"},
+    {"name": "DB_PORT", "value": "5432"},
+]
+_RESOURCES = {
+    "requests": {"cpu": "250m", "memory": "256Mi"},
+    "limits": {"cpu": "500m", "memory": "512Mi"},
+}
+_HEALTH_GET = {"path": "/health", "port": 8080}
+_TCP_8080 = {"port": 8080}
+
+
+@pytest.fixture(scope="class")
+def app_containers():
+    """Container dicts for the read-only TestContainer cases, built once.
+
+    One Deployment per case under a single manifest(), keyed by name.
+    """
+    _reset()  # runs before the function-scoped clean_stack
+    _reset_tracking()
+    with manifest() as m:
+        with Deployment("envvar-plain"):
+            with Container("app", image="app:v1"):
+                EnvVar("DB_HOST", "localhost")
+                EnvVar("DB_PORT", "5432")
+        with Deployment("envvar-secret"):
+            with Container("app", image="app:v1"):
+                EnvVar("PASSWORD", secret_ref="my-secret", secret_key="db-pass")
+        with Deployment("envvar-configmap"):
+            with Container("app", image="app:v1"):
+                EnvVar("CONFIG", configmap_ref="my-config", configmap_key="setting")
+        with Deployment("resources"):
+            with Container("app", image="app:v1"):
+                Resources(cpu="250m", memory="256Mi",
+                          limits_cpu="500m", limits_memory="512Mi")
+        with Deployment("probes"):
+            with Container("app", image="app:v1"):
+                Probe("liveness", http_get={"path": "/health", "port": 8080},
+                      initial_delay=10, period=30)
+                Probe("readiness", tcp_socket={"port": 8080})
+        with Deployment("volume-mount"):
+            with Container("app", image="app:v1"):
+                VolumeMount("/config", "cfg", read_only=True)
+
+    return {
+        d["metadata"]["name"]: d["spec"]["template"]["spec"]["containers"][0]
+        for d in m.to_dicts()
+    }
 
-        containers = m.to_dicts()[0]["spec"]["template"]["spec"]["containers"]
-        env = containers[0]["env"]
-        assert len(env) == 2
-        assert env[0] == {"name": "DB_HOST", "value": "localhost"}
-        assert env[1] == {"name": "DB_PORT", "value": "5432"}
 
-    def test_envvar_secret_ref(self):
-        with manifest() as m:
-            with Deployment("app"):
-                with Container("app", image="app:v1"):
-                    EnvVar("PASSWORD", secret_ref="my-secret", secret_key="db-pass")
+class TestContainer:
+    def test_envvar_plain(self, app_containers):
+        assert app_containers["envvar-plain"]["env"] == _ENV_PLAIN
 
-        env = m.to_dicts()[0]["spec"]["template"]["spec"]["containers"][0]["env"]
+    def test_envvar_secret_ref(self, app_containers):
+        env = app_containers["envvar-secret"]["env"]
         assert env[0]["valueFrom"]["secretKeyRef"]["name"] == "my-secret"
         assert env[0]["valueFrom"]["secretKeyRef"]["key"] == "db-pass"
 
-    def test_envvar_configmap_ref(self):
-        with manifest() as m:
-            with Deployment("app"):
-                with Container("app", image="app:v1"):
-                    EnvVar("CONFIG", configmap_ref="my-config", configmap_key="setting")
-
-        env = m.to_dicts()[0]["spec"]["template"]["spec"]["containers"][0]["env"]
+    def test_envvar_configmap_ref(self, app_containers):
+        env = app_containers["envvar-configmap"]["env"]
         assert env[0]["valueFrom"]["configMapKeyRef"]["name"] == "my-config"
 
-    def test_resources(self):
-        with manifest() as m:
-            with Deployment("app"):
-                with Container("app", image="app:v1"):
-                    Resources(cpu="250m", memory="256Mi",
-                              limits_cpu="500m", limits_memory="512Mi")
+    def test_resources(self, app_containers):
+        assert app_containers["resources"]["resources"] == _RESOURCES
 
-        res = m.to_dicts()[0]["spec"]["template"]["spec"]["containers"][0]["resources"]
-        assert res["requests"]["cpu"] == "250m"
-        assert res["requests"]["memory"] == "256Mi"
-        assert res["limits"]["cpu"] == "500m"
-        assert res["limits"]["memory"] == "512Mi"
+    def test_probes(self, app_containers, assert_subset):
+        c = app_containers["probes"]
+        assert_subset({
+            "httpGet": _HEALTH_GET, "initialDelaySeconds": 10, "periodSeconds": 30,
+        }, c["livenessProbe"])
+        assert c["readinessProbe"]["tcpSocket"] == _TCP_8080
 
-    def test_probes(self):
-        with manifest() as m:
-            with Deployment("app"):
-                with Container("app", image="app:v1"):
-                    Probe("liveness", http_get={"path": "/health", "port": 8080},
-                          initial_delay=10, period=30)
-                    Probe("readiness", tcp_socket={"port": 8080})
-
-        c = m.to_dicts()[0]["spec"]["template"]["spec"]["containers"][0]
-        assert "livenessProbe" in c
-        assert c["livenessProbe"]["httpGet"]["path"] == "/health"
-        assert c["livenessProbe"]["initialDelaySeconds"] == 10
-        assert "readinessProbe" in c
-        assert c["readinessProbe"]["tcpSocket"]["port"] == 8080
-
-    def test_volume_mount(self):
-        with manifest() as m:
-            with Deployment("app"):
-                with Container("app", image="app:v1"):
-                    VolumeMount("/config", "cfg", read_only=True)
-
-        c = m.to_dicts()[0]["spec"]["template"]["spec"]["containers"][0]
+    def test_volume_mount(self, app_containers):
+        c = app_containers["volume-mount"]
         assert c["volumeMounts"][0]["mountPath"] == "/config"
         assert c["volumeMounts"][0]["readOnly"] is True
 
-    def test_port_outside_container_raises(self):
-        with manifest() as m:
+    @pytest.mark.parametrize("leaf", [
+        lambda: Port(80),
+        lambda: EnvVar("A", "B"),
+        lambda: Resources(cpu="100m"),
+        lambda: VolumeMount("/x", "y"),
+        lambda: Probe("liveness", tcp_socket={"port": 80}),
+        lambda: ServicePort(80),
+        lambda: Data("k", "v"),
+        lambda: IngressRule("/", "svc", 80),
+    ], ids=[
+        "Port", "EnvVar", "Resources", "VolumeMount",
+        "Probe", "ServicePort", "Data", "IngressRule",
+    ])
+    def test_leaf_outside_parent_raises(self, leaf):
+        with manifest():
             with Deployment("app"):
                 with pytest.raises(TypeError):
-                    Port(80)
+                    leaf()
 
     def test_multiple_containers(self):
         with manifest() as m:
@@ -199,11 +218,11 @@ class TestService:
                     Port(80)
                 Service(port=80)
 
-        svc = m.to_dicts()[1]
-        assert svc["spec"]["ports"][0]["port"] == 80
-        assert svc["spec"]["selector"] == {"app": "web"}
+        spec = m.to_dicts()[1]["spec"]
+        assert spec["ports"][0]["port"] == 80
+        assert spec["selector"] == {"app": "web"}
 
-    def test_service_with_mode(self):
+    def test_service_with_mode(self, assert_subset):
         with manifest() as m:
             with Deployment("web"):
                 with Container("web", image="nginx"):
@@ -213,10 +232,10 @@ class TestService:
                     ServicePort(80, name="http")
                     ServicePort(443, name="https", node_port=30443)
 
-        svc = m.to_dicts()[1]
-        assert svc["spec"]["type"] == "NodePort"
-        assert len(svc["spec"]["ports"]) == 2
-        assert svc["spec"]["ports"][1]["nodePort"] == 30443
+        spec = m.to_dicts()[1]["spec"]
+        assert spec["type"] == "NodePort"
+        assert len(spec["ports"]) == 2
+        assert_subset({"port": 443, "name": "https", "nodePort": 30443}, spec["ports"][1])
 
     def test_standalone_service(self):
         """Service can be used outside Deployment."""
@@ -260,10 +279,7 @@ class TestConfigMapSecret:
         sec = m.to_dicts()[0]
         assert sec["kind"] == "Secret"
         assert sec["type"] == "Opaque"
-        # base64 encoded
-        import base64
-        decoded = base64.b64decode(sec["data"]["password"]).decode()
-        assert decoded == "s3cret"
+        assert sec["data"]["password"] == _S3CRET_B64  # base64 encoded
 
     def test_secret_string_data(self):
         with manifest() as m:
@@ -285,11 +301,12 @@ class TestIngress:
 
         ing = m.to_dicts()[0]
         assert ing["kind"] == "Ingress"
-        assert ing["spec"]["ingressClassName"] == "nginx"
-        assert ing["spec"]["tls"][0]["hosts"] == ["app.example.com"]
+        spec = ing["spec"]
+        assert spec["ingressClassName"] == "nginx"
+        assert spec["tls"][0]["hosts"] == ["app.example.com"]
         # Same host → one rule, two paths
-        assert len(ing["spec"]["rules"]) == 1
-        assert len(ing["spec"]["rules"][0]["http"]["paths"]) == 2
+        assert len(spec["rules"]) == 1
+        assert len(spec["rules"][0]["http"]["paths"]) == 2
 
     def test_multi_host_ingress(self):
         with manifest() as m:
@@ -305,7 +322,7 @@ class TestIngress:
 # STATEFULSET
 # ─────────────────────────────────────────────
 class TestStatefulSet:
-    def test_statefulset(self):
+    def test_statefulset(self, assert_subset):
         with manifest() as m:
             with StatefulSet("pg", replicas=3):
                 with Container("pg", image="postgres:16"):
@@ -317,10 +334,11 @@ class TestStatefulSet:
         docs = m.to_dicts()
         ss = docs[0]
         assert ss["kind"] == "StatefulSet"
-        assert ss["spec"]["replicas"] == 3
-        assert ss["spec"]["serviceName"] == "pg"
-        assert len(ss["spec"]["volumeClaimTemplates"]) == 1
-        assert ss["spec"]["volumeClaimTemplates"][0]["spec"]["resources"]["requests"]["storage"] == "100Gi"
+        spec = ss["spec"]
+        assert_subset({"replicas": 3, "serviceName": "pg"}, spec)
+        claims = spec["volumeClaimTemplates"]
+        assert len(claims) == 1
+        assert claims[0]["spec"]["resources"]["requests"]["storage"] == "100Gi"
         # Service
         assert docs[1]["kind"] == "Service"
 
@@ -418,21 +436,22 @@ class TestManifest:
                 Data("key", "val")
 
         docs = m.to_dicts()
-        kinds = [d["kind"] for d in docs]
-        assert "Namespace" in kinds
-        assert "Deployment" in kinds
-        assert "Service" in kinds
-        assert "ConfigMap" in kinds
+        kinds = {d["kind"] for d in docs}
+        assert {"Namespace", "Deployment", "Service", "ConfigMap"} <= kinds
 
-    def test_to_yaml(self):
+    def test_yaml_format_smoke(self):
+        """Format-only check of to_yaml(); content is asserted on to_dicts()
+        elsewhere and the parse round-trip lives in TestFullStack."""
         with manifest() as m:
             with Deployment("web"):
                 with Container("web", image="nginx"):
                     Port(80)
 
         yaml_str = m.to_yaml()
-        assert "kind: Deployment" in yaml_str
-        assert "image: nginx" in yaml_str
+        # Block style, insertion key order
+        assert yaml_str.startswith("apiVersion: apps/v1\nkind: Deployment\n")
+        assert "      - name: web\n        image: nginx\n" in yaml_str
+        assert "&id" not in yaml_str  # shared label dicts are not aliased
 
     def test_nested_manifest_isolation(self):
         """Nested manifests do not affect each other."""
@@ -443,59 +462,79 @@ class TestManifest:
             assert len(inner.to_dicts()) == 1
         assert len(outer.to_dicts()) == 1
 
+    def test_tracking_labels_are_context_local(self):
+        """Interleaved asyncio tasks on one thread keep their own labels."""
+        async def render(chart):
+            set_tracking(chart=chart)
+            await asyncio.sleep(0)  # let the other task set its labels
+            with manifest() as m:
+                Namespace(chart)
+            return m.to_dicts()[0]["metadata"]["labels"]["bow.io/chart"]
+
+        async def main():
+            return await asyncio.gather(render("a"), render("b"))
+
+        assert asyncio.run(main()) == ["a", "b"]
+
 
 # ─────────────────────────────────────────────
 # FULL STACK — PostgreSQL example
 # ─────────────────────────────────────────────
-class TestFullStack:
-    def test_postgresql_full(self):
-        """Full PostgreSQL deployment — demonstrates the power of bow."""
-        with manifest() as m:
-            with Secret("pg-credentials"):
-                Data("POSTGRES_USER", "admin")
-                Data("POSTGRES_PASSWORD", "s3cret")
-
-            with ConfigMap("pg-config"):
-                Data("POSTGRES_DB", "appdb")
-                Data("PGDATA", "/var/lib/postgresql/data/pgdata")
-
-            with Deployment("postgresql", replicas=1):
-                ConfigMapVolume("config", "pg-config")
-                SecretVolume("creds", "pg-credentials")
-
-                with Container("postgresql", image="postgres:16"):
-                    Port(5432, name="pg")
-                    EnvVar("POSTGRES_DB", configmap_ref="pg-config",
-                           configmap_key="POSTGRES_DB")
-                    EnvVar("POSTGRES_USER", secret_ref="pg-credentials",
-                           secret_key="POSTGRES_USER")
-                    EnvVar("POSTGRES_PASSWORD", secret_ref="pg-credentials",
-                           secret_key="POSTGRES_PASSWORD")
-                    Resources(cpu="250m", memory="256Mi",
-                              limits_cpu="500m", limits_memory="512Mi")
-                    VolumeMount("/var/lib/postgresql/data", "pgdata")
-                    Probe("liveness", tcp_socket={"port": 5432},
-                          initial_delay=30, period=10)
-                    Probe("readiness", exec_command=[
-                        "pg_isready", "-U", "admin"
-                    ], initial_delay=5, period=5)
+@pytest.fixture(scope="module")
+def pg_full():
+    """Full PostgreSQL deployment — demonstrates the power of bow.
+
+    Built once per module: (docs, yaml_str) for the read-only tests below.
+    """
+    _reset()  # runs before the function-scoped clean_stack
+    _reset_tracking()
+    with manifest() as m:
+        with Secret("pg-credentials"):
+            Data("POSTGRES_USER", "admin")
+            Data("POSTGRES_PASSWORD", "s3cret")
+
+        with ConfigMap("pg-config"):
+            Data("POSTGRES_DB", "appdb")
+            Data("PGDATA", "/var/lib/postgresql/data/pgdata")
+
+        with Deployment("postgresql", replicas=1):
+            ConfigMapVolume("config", "pg-config")
+            SecretVolume("creds", "pg-credentials")
+
+            with Container("postgresql", image="postgres:16"):
+                Port(5432, name="pg")
+                EnvVar("POSTGRES_DB", configmap_ref="pg-config",
+                       configmap_key="POSTGRES_DB")
+                EnvVar("POSTGRES_USER", secret_ref="pg-credentials",
+                       secret_key="POSTGRES_USER")
+                EnvVar("POSTGRES_PASSWORD", secret_ref="pg-credentials",
+                       secret_key="POSTGRES_PASSWORD")
+                Resources(cpu="250m", memory="256Mi",
+                          limits_cpu="500m", limits_memory="512Mi")
+                VolumeMount("/var/lib/postgresql/data", "pgdata")
+                Probe("liveness", tcp_socket={"port": 5432},
+                      initial_delay=30, period=10)
+                Probe("readiness", exec_command=[
+                    "pg_isready", "-U", "admin"
+                ], initial_delay=5, period=5)
+
+            PersistentVolumeClaim("pgdata", size="50Gi")
+            Service(port=5432)
+
+    docs = m.to_dicts()
+    return docs, _dump_docs(docs)
 
-                PersistentVolumeClaim("pgdata", size="50Gi")
-                Service(port=5432)
 
-        docs = m.to_dicts()
-        kinds = [d["kind"] for d in docs]
-        assert kinds == [
-            "Secret",
-            "ConfigMap",
-            "PersistentVolumeClaim",
-            "Deployment",
-            "Service",
-        ]
-
-        # YAML render
-        yaml_str = m.to_yaml()
-        assert "---" in yaml_str
-        # Should be parseable
-        parsed = list(yaml.safe_load_all(yaml_str))
-        assert len(parsed) == 5
+class TestFullStack:
+    def test_postgresql_docs_match_snapshot(self, pg_full):
+        docs, _ = pg_full
+        assert docs == EXPECTED_DOCS
+
+    def test_postgresql_yaml_render(self, pg_full):
+        _, yaml_str = pg_full
+        # 5 documents, "---" between them
+        assert yaml_str.count("\n---\n") == 4
+
+    def test_postgresql_yaml_parses(self, pg_full):
+        docs, yaml_str = pg_full
+        assert list(load_all_yaml(yaml_str)) == docs
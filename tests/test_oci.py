@@ -5,31 +5,37 @@ Config, env, client pack/push/pull, whitelist,
 full workflow (push → pull → install → discover).
 """
 
-import os
-import sys
 import json
+import os
 import shutil
 import pytest
-import tempfile
-import yaml
+from pathlib import Path
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from click.testing import CliRunner
 
+from bow.cli import main
 from bow.core.stack import _reset
+from bow.oci.client import (
+    CHART_CONTENT_MEDIA_TYPE_ZSTD, OCIError, _work_root, list_remote_charts,
+    pack_chart, pull_chart, push_chart, unpack_chart,
+)
 from bow.chart.registry import reset_registry
 
 
+runner = CliRunner()
+
+
 @pytest.fixture(autouse=True)
 def clean(tmp_path, monkeypatch):
-    """Her test için temiz ~/.bow"""
-    _reset()
-    reset_registry()
-    # ~/.bow'u tmp_path'e yönlendir
-    monkeypatch.setattr("bow.oci.config.BOW_HOME", tmp_path)
-    monkeypatch.setattr("bow.oci.env.ENVS_DIR", tmp_path / "envs")
-    yield
+    """Clean ~/.bow for each test.
+
+    Stack and registry are reset on setup only: every test that uses the
+    registry restores it in its own setup, so no teardown reset is needed.
+    """
     _reset()
     reset_registry()
+    # Point ~/.bow at tmp_path
+    monkeypatch.setenv("BOW_HOME", str(tmp_path))
 
 
 # ─────────────────────────────────────────────
@@ -42,6 +48,12 @@ class TestConfig:
         assert cfg.active_env == "default"
         assert cfg.registries == {}
 
+    def test_bow_home_env(self, tmp_path, monkeypatch):
+        from bow.oci.config import config_path
+        from bow.oci.env import envs_dir
+        assert config_path() == tmp_path / "config.yaml"
+        assert envs_dir() == tmp_path / "envs"
+
     def test_save_and_load(self, tmp_path, monkeypatch):
         from bow.oci.config import (
             load_config, save_config, RegistryConfig,
@@ -61,16 +73,20 @@ class TestConfig:
         assert cfg2.registries["local"].default is True
         assert "oci://local" in cfg2.allowed_registries
 
-    def test_whitelist_check(self):
-        from bow.oci.config import BowConfig
-        cfg = BowConfig(allowed_registries=["oci://ghcr.io/myorg"])
-        assert cfg.is_registry_allowed("oci://ghcr.io/myorg/charts")
-        assert not cfg.is_registry_allowed("oci://evil.com/charts")
+    def test_save_without_libyaml_writes_json(self, tmp_path, monkeypatch):
+        import bow.oci.config as config
+        monkeypatch.setattr(config, "_HAS_LIBYAML", False)
+        cfg = config.BowConfig(active_env="prod")
+        cfg.registries["local"] = config.RegistryConfig(
+            name="local", url="oci://local", default=True,
+        )
+        config.save_config(cfg)
 
-    def test_empty_whitelist_allows_all(self):
-        from bow.oci.config import BowConfig
-        cfg = BowConfig(allowed_registries=[])
-        assert cfg.is_registry_allowed("oci://anything")
+        text = config.config_path().read_text()
+        assert json.loads(text)["active_env"] == "prod"
+        cfg2 = config.load_config()
+        assert cfg2.active_env == "prod"
+        assert cfg2.registries["local"].default is True
 
     def test_default_registry(self):
         from bow.oci.config import BowConfig, RegistryConfig
@@ -84,6 +100,30 @@ class TestConfig:
 # ─────────────────────────────────────────────
 # ENV
 # ─────────────────────────────────────────────
+@pytest.fixture(scope="session")
+def venv_template(tmp_path_factory):
+    """An env venv, really created once per session."""
+    from bow.oci.env import _create_venv
+    path = tmp_path_factory.mktemp("venv-template") / "venv"
+    _create_venv(path)
+    return path
+
+
+@pytest.fixture
+def linked_venv(venv_template, monkeypatch):
+    """create_env hardlink-copies the template instead of building a venv.
+
+    Script shebangs in the copy point at the template: only for tests that
+    never pip-install into the venv.
+    """
+    import bow.oci.env as oci_env
+
+    def _link(venv_path):
+        shutil.copytree(venv_template, venv_path, symlinks=True, copy_function=os.link)
+    monkeypatch.setattr(oci_env, "_create_venv", _link)
+
+
+@pytest.mark.usefixtures("linked_venv")
 class TestEnv:
     def test_create_env(self, tmp_path, monkeypatch):
         from bow.oci.env import create_env
@@ -143,65 +183,196 @@ class TestEnv:
 # ─────────────────────────────────────────────
 # CLIENT — PACK / PUSH / PULL
 # ─────────────────────────────────────────────
-class TestClient:
-    def _make_chart_dir(self, tmp_path):
-        """Test chart dizini oluştur."""
-        chart_dir = tmp_path / "bow-testchart"
-        src_dir = chart_dir / "src" / "bow_testchart"
-        src_dir.mkdir(parents=True)
-
-        # chart.json
-        with open(chart_dir / "chart.json", "w") as f:
-            json.dump({
-                "name": "testchart",
-                "version": "1.0.0",
-                "description": "Test chart",
-                "package_name": "bow-testchart",
-            }, f)
-
-        # __init__.py
-        (src_dir / "__init__.py").write_text(
+def _chart_blobs(name, cls, version, *, meta=None, deps="", defaults=b'{"x": 1}\n'):
+    """File contents (relpath → bytes), built once at import."""
+    pkg = f"bow_{name}"
+    files = {
+        f"src/{pkg}/__init__.py": (
             'from bow.chart.base import Chart\n'
-            'class TestChart(Chart):\n'
-            '    name = "testchart"\n'
-            '    version = "1.0.0"\n'
+            f'class {cls}(Chart):\n'
+            f'    name = "{name}"\n'
+            f'    version = "{version}"\n'
             '    def render(self, values): pass\n'
-        )
-
-        # defaults.yaml
-        (src_dir / "defaults.yaml").write_text("replicas: 1\n")
-
-        # pyproject.toml
-        (chart_dir / "pyproject.toml").write_text(
+        ).encode(),
+        f"src/{pkg}/defaults.yaml": defaults,
+        "pyproject.toml": (
             '[build-system]\n'
             'requires = ["hatchling"]\n'
             'build-backend = "hatchling.build"\n'
             '[project]\n'
-            'name = "bow-testchart"\n'
-            'version = "1.0.0"\n'
-            'dependencies = ["bow>=0.1.0"]\n'
+            f'name = "bow-{name}"\n'
+            f'version = "{version}"\n'
+            f'dependencies = [{deps}]\n'
             '[project.entry-points."bow.charts"]\n'
-            'testchart = "bow_testchart:TestChart"\n'
+            f'{name} = "{pkg}:{cls}"\n'
             '[tool.hatch.build.targets.wheel]\n'
-            'packages = ["src/bow_testchart"]\n'
-        )
+            f'packages = ["src/{pkg}"]\n'
+        ).encode(),
+    }
+    if meta is not None:
+        files["chart.json"] = json.dumps(meta).encode()
+    return files
+
+
+_TESTCHART_FILES = _chart_blobs(
+    "testchart", "TestChart", "1.0.0",
+    meta={
+        "name": "testchart",
+        "version": "1.0.0",
+        "description": "Test chart",
+        "package_name": "bow-testchart",
+    },
+    deps='"bow>=0.1.0"',
+    defaults=b'{"replicas": 1}\n',
+)
+_MINI_FILES = _chart_blobs(
+    "mini", "MiniChart", "0.1.0",
+    meta={"name": "mini", "version": "0.1.0", "package_name": "bow-mini"},
+)
+_MYCHART_FILES = _chart_blobs(
+    "mychart", "MyChart", "1.0.0",
+    meta={"name": "mychart", "version": "1.0.0", "package_name": "bow-mychart"},
+)
+_LOCALCHART_FILES = _chart_blobs("localchart", "LocalChart", "0.1.0")
+_EDITCHART_FILES = _chart_blobs("editchart", "EditChart", "0.1.0")
+_RMCHART_FILES = _chart_blobs("rmchart", "RmChart", "0.1.0")
+
+
+def _write_chart_dir(root, files=_TESTCHART_FILES, dirname="bow-testchart"):
+    """Create a test chart directory (root/<dirname>)."""
+    chart_dir = root / dirname
+    for rel, blob in files.items():
+        path = chart_dir / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(blob)
+    return chart_dir
+
+
+@pytest.fixture(scope="session")
+def chart_src(tmp_path_factory):
+    """bow-testchart source tree, written once per session (read-only)."""
+    return _write_chart_dir(tmp_path_factory.mktemp("chart-src"))
+
+
+@pytest.fixture
+def chart_dir(chart_src, tmp_path):
+    """Private copy of chart_src for tests that pack or edit it."""
+    return Path(shutil.copytree(chart_src, tmp_path / chart_src.name))
+
+
+@pytest.fixture(scope="session")
+def linked_chart(tmp_path_factory):
+    """linked_chart(files, dirname, root) -> root/<dirname>, hardlinked.
+
+    Each blob set is written once per session; tests get a tree of hard
+    links to it. Only for tests that read the tree: an in-place edit
+    would change the shared inode (use chart_dir for those).
+    """
+    written = {}
+
+    def _link(files, dirname, root):
+        src = written.get(dirname)
+        if src is None:
+            src = written[dirname] = _write_chart_dir(
+                tmp_path_factory.mktemp("chart-src"), files, dirname,
+            )
+        return Path(shutil.copytree(src, root / dirname, copy_function=os.link))
+    return _link
+
+
+@pytest.fixture(scope="session")
+def packed_chart(chart_src):
+    """chart_src packed once per session (read-only).
+
+    Each source digest gets its own pack dir, so later packs of the same
+    name/version never overwrite this tar.
+    """
+    return pack_chart(chart_src)
 
-        return chart_dir
 
-    def test_pack_chart(self, tmp_path):
-        from bow.oci.client import pack_chart
-        chart_dir = self._make_chart_dir(tmp_path)
-        artifact = pack_chart(chart_dir)
+class TestClient:
+    def test_pack_chart(self, packed_chart):
+        artifact = packed_chart
         assert artifact.name == "testchart"
         assert artifact.version == "1.0.0"
         assert artifact.digest.startswith("sha256:")
         assert artifact.tar_path.exists()
 
-    def test_push_and_pull(self, tmp_path, monkeypatch):
-        from bow.oci.client import pack_chart, push_chart, pull_chart
+    def test_pack_sees_edited_chart_json(self, chart_dir):
+        assert pack_chart(chart_dir).version == "1.0.0"
+        meta = json.loads((chart_dir / "chart.json").read_text())
+        meta["version"] = "1.0.10"
+        (chart_dir / "chart.json").write_text(json.dumps(meta))
+        assert pack_chart(chart_dir).version == "1.0.10"
+
+    def test_repack_unchanged_sources_is_noop(self, chart_dir):
+        first = pack_chart(chart_dir)
+        inode = first.tar_path.stat().st_ino
+        second = pack_chart(chart_dir)
+        assert second.digest == first.digest
+        assert second.tar_path.stat().st_ino == inode
+
+    def test_pack_digest_matches_file(self, packed_chart):
+        import hashlib
+        artifact = packed_chart
+        expected = hashlib.sha256(artifact.tar_path.read_bytes()).hexdigest()
+        assert artifact.digest == f"sha256:{expected}"
+
+    def test_repack_after_edit_keeps_earlier_tarball(self, chart_dir):
+        import hashlib
+        first = pack_chart(chart_dir)
+        (chart_dir / "src" / "bow_testchart" / "defaults.yaml").write_text("replicas: 3\n")
+        second = pack_chart(chart_dir)
+
+        assert second.tar_path != first.tar_path
+        assert second.digest != first.digest
+        for artifact in (first, second):
+            expected = hashlib.sha256(artifact.tar_path.read_bytes()).hexdigest()
+            assert artifact.digest == f"sha256:{expected}"
+
+    def test_repack_sees_same_size_edit_within_one_mtime_tick(self, chart_dir):
+        import tarfile
+        defaults = chart_dir / "src" / "bow_testchart" / "defaults.yaml"
+        defaults.write_text("replicas: 3\n")
+        first = pack_chart(chart_dir)
+        st = defaults.stat()
+
+        # Same-size rewrite, mtime put back as if it landed in the same tick
+        defaults.write_text("replicas: 7\n")
+        os.utime(defaults, ns=(st.st_atime_ns, st.st_mtime_ns))
+        second = pack_chart(chart_dir)
+
+        assert second.digest != first.digest
+        with tarfile.open(second.tar_path) as tar:
+            member = tar.extractfile("src/bow_testchart/defaults.yaml")
+            assert member.read() == b"replicas: 7\n"
+
+    def test_repack_does_not_touch_pushed_tarball(self, tmp_path, chart_dir):
+        push_chart(pack_chart(chart_dir), f"oci://{tmp_path / 'registry'}")
+        pushed = tmp_path / "registry" / "testchart" / "1.0.0" / "testchart-1.0.0.tar.gz"
+        before = pushed.read_bytes()
+
+        (chart_dir / "src" / "bow_testchart" / "defaults.yaml").write_text("replicas: 3\n")
+        pack_chart(chart_dir)
+        assert pushed.read_bytes() == before
+
+    def test_repush_sees_same_size_manifest_rewrite(self, tmp_path, packed_chart):
+        from dataclasses import replace
+        registry_url = f"oci://{tmp_path / 'registry'}"
+        push_chart(packed_chart, registry_url)
+        manifest_file = tmp_path / "registry" / "testchart" / "1.0.0" / "manifest.json"
+        st = manifest_file.stat()
 
-        chart_dir = self._make_chart_dir(tmp_path)
-        artifact = pack_chart(chart_dir)
+        # Same-size manifest, rewritten within the same mtime tick
+        push_chart(replace(packed_chart, digest="sha256:" + "0" * 64), registry_url)
+        os.utime(manifest_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        push_chart(packed_chart, registry_url)
+        manifest = json.loads(manifest_file.read_text())
+        assert manifest["config"]["digest"] == packed_chart.digest
+
+    def test_push_and_pull(self, tmp_path, packed_chart):
+        artifact = packed_chart
 
         # Push
         registry_url = f"oci://{tmp_path / 'registry'}"
@@ -215,25 +386,134 @@ class TestClient:
         assert pulled.digest == artifact.digest
         assert pulled.tar_path.exists()
 
+    def test_pull_cache_is_content_addressed(self, tmp_path, packed_chart):
+        artifact = packed_chart
+        registry_url = f"oci://{tmp_path / 'registry'}"
+        push_chart(artifact, registry_url)
+        cache_dir = tmp_path / "cache"
+
+        pulled = pull_chart("testchart", "1.0.0", registry_url, cache_dir)
+        assert pulled.tar_path.name == artifact.digest.replace(":", "_") + ".tar.gz"
+
+        # A corrupted entry is detected once and replaced
+        pulled.tar_path.unlink()
+        pulled.tar_path.write_bytes(b"garbage")
+        again = pull_chart("testchart", "1.0.0", registry_url, cache_dir)
+        assert again.tar_path.read_bytes() == artifact.tar_path.read_bytes()
+
+        pull_chart("testchart", "1.0.0", registry_url, cache_dir)
+        assert (cache_dir / (again.tar_path.name + ".verified")).exists()
+
     def test_pull_nonexistent(self, tmp_path):
-        from bow.oci.client import pull_chart, OCIError
         with pytest.raises(OCIError, match="not found"):
             pull_chart("nope", "1.0.0", f"oci://{tmp_path}/empty", tmp_path / "c")
 
-    def test_unpack(self, tmp_path):
-        from bow.oci.client import pack_chart, unpack_chart
-        chart_dir = self._make_chart_dir(tmp_path)
-        artifact = pack_chart(chart_dir)
+    def test_unpack(self, tmp_path, packed_chart):
+        dest = tmp_path / "unpacked"
+        unpack_chart(packed_chart.tar_path, dest)
+        assert (dest / "chart.json").exists()
+
+    def test_unpack_stdlib_gzip_fallback(self, tmp_path, monkeypatch, chart_dir):
+        import bow.oci.client as client
+        monkeypatch.setattr(client, "_GZIP_MODULES", ())
+        monkeypatch.setattr(client, "_GZIP_READ_MODULES", ())
+        monkeypatch.setattr(client.shutil, "which", lambda name: None)
+        artifact = client.pack_chart(chart_dir)
         dest = tmp_path / "unpacked"
-        unpack_chart(artifact.tar_path, dest)
+        client.unpack_chart(artifact.tar_path, dest)
         assert (dest / "chart.json").exists()
 
-    def test_list_remote(self, tmp_path):
-        from bow.oci.client import pack_chart, push_chart, list_remote_charts
-        chart_dir = self._make_chart_dir(tmp_path)
+    def test_pack_reuses_process_work_dir(self, chart_dir):
+        first = pack_chart(chart_dir)
+        second = pack_chart(chart_dir)
+        assert first.tar_path == second.tar_path
+        assert first.tar_path.parent.parent == _work_root()
+
+    def test_pack_skips_cache_and_dot_dirs(self, chart_dir):
+        import tarfile
+        src_dir = chart_dir / "src" / "bow_testchart"
+        (src_dir / "__pycache__").mkdir()
+        (src_dir / "__pycache__" / "x.cpython-311.pyc").write_bytes(b"\0")
+        (src_dir / ".venv" / "lib").mkdir(parents=True)
+        (src_dir / ".venv" / "lib" / "junk.py").write_text("")
+        (src_dir / ".hidden").write_text("")
+
         artifact = pack_chart(chart_dir)
-        registry_url = f"oci://{tmp_path / 'reg'}"
+        with tarfile.open(artifact.tar_path) as tar:
+            names = tar.getnames()
+        assert "src/bow_testchart/defaults.yaml" in names
+        assert "bow_testchart/defaults.yaml" in names
+        assert len(names) == len(set(names))
+        assert not any("__pycache__" in n or "/." in n for n in names)
+
+    def test_zstd_push_pull_unpack(self, tmp_path, chart_dir):
+        pytest.importorskip("zstandard")
+        artifact = pack_chart(chart_dir, compression="zstd")
+        assert artifact.tar_path.name.endswith(".tar.zst")
+        assert artifact.media_type == CHART_CONTENT_MEDIA_TYPE_ZSTD
+
+        registry_url = f"oci://{tmp_path / 'registry'}"
         push_chart(artifact, registry_url)
+        pulled = pull_chart("testchart", "1.0.0", registry_url, tmp_path / "cache")
+        assert pulled.digest == artifact.digest
+        assert pulled.media_type == CHART_CONTENT_MEDIA_TYPE_ZSTD
+
+        dest = tmp_path / "unpacked"
+        unpack_chart(pulled.tar_path, dest)
+        assert (dest / "chart.json").exists()
+        assert (dest / "src" / "bow_testchart" / "defaults.yaml").exists()
+
+    def test_repush_other_compression_replaces_tarball(self, tmp_path, chart_dir, packed_chart):
+        import hashlib
+        pytest.importorskip("zstandard")
+        registry_url = f"oci://{tmp_path / 'registry'}"
+        push_chart(packed_chart, registry_url)
+        zst = pack_chart(chart_dir, compression="zstd")
+        push_chart(zst, registry_url)
+
+        tag_dir = tmp_path / "registry" / "testchart" / "1.0.0"
+        assert sorted(p.name for p in tag_dir.glob("*.tar.*")) == ["testchart-1.0.0.tar.zst"]
+
+        pulled = pull_chart("testchart", "1.0.0", registry_url, tmp_path / "cache")
+        assert pulled.media_type == CHART_CONTENT_MEDIA_TYPE_ZSTD
+        assert pulled.tar_path.name.endswith(".tar.zst")
+        expected = hashlib.sha256(pulled.tar_path.read_bytes()).hexdigest()
+        assert pulled.digest == zst.digest == f"sha256:{expected}"
+
+    def test_pull_rejects_tarball_not_matching_manifest(self, tmp_path, packed_chart):
+        registry_url = f"oci://{tmp_path / 'registry'}"
+        push_chart(packed_chart, registry_url)
+        pushed = tmp_path / "registry" / "testchart" / "1.0.0" / "testchart-1.0.0.tar.gz"
+        pushed.unlink()  # new inode: the pushed file shares packed_chart's
+        pushed.write_bytes(b"garbage")
+
+        cache_dir = tmp_path / "cache"
+        with pytest.raises(OCIError, match="Digest mismatch"):
+            pull_chart("testchart", "1.0.0", registry_url, cache_dir)
+        assert not list(cache_dir.glob("sha256_*"))
+
+    def test_pack_writes_tar_as_stream(self, monkeypatch, chart_dir):
+        import tarfile
+        modes = []
+        real_open = tarfile.open
+
+        def spy(*args, **kwargs):
+            modes.append(kwargs.get("mode"))
+            return real_open(*args, **kwargs)
+
+        # New contents, so the in-process pack memo does not kick in
+        (chart_dir / "src" / "bow_testchart" / "defaults.yaml").write_text("replicas: 2\n")
+        monkeypatch.setattr(tarfile, "open", spy)
+        pack_chart(chart_dir)
+        assert modes == ["w|"]
+
+    def test_unknown_compression_raises(self, chart_dir):
+        with pytest.raises(OCIError, match="Unsupported compression"):
+            pack_chart(chart_dir, compression="lz4")
+
+    def test_list_remote(self, tmp_path, packed_chart):
+        registry_url = f"oci://{tmp_path / 'reg'}"
+        push_chart(packed_chart, registry_url)
 
         charts = list_remote_charts(registry_url)
         assert len(charts) == 1
@@ -245,61 +525,77 @@ class TestClient:
 # WHITELIST
 # ─────────────────────────────────────────────
 class TestWhitelist:
-    def test_blocked_registry(self):
+    @pytest.mark.parametrize("allowed,url,expected", [
+        (["oci://ghcr.io/myorg"], "oci://ghcr.io/myorg/charts", True),
+        (["oci://ghcr.io/myorg"], "oci://evil.com/charts", False),
+        ([], "oci://anything", True),
+        (["oci://trusted.io"], "oci://evil.com/charts", False),
+        (["oci://ghcr.io/myorg"], "oci://ghcr.io/myorg/sub/path", True),
+        (["oci://ghcr.io/myorg"], "oci://ghcr.io/other", False),
+    ], ids=["allowed", "blocked", "empty-allows-all", "blocked-other",
+            "subpath", "sibling-blocked"])
+    def test_is_registry_allowed(self, allowed, url, expected):
         from bow.oci.config import BowConfig
-        cfg = BowConfig(allowed_registries=["oci://trusted.io"])
-        assert not cfg.is_registry_allowed("oci://evil.com/charts")
-
-    def test_allowed_registry(self):
-        from bow.oci.config import BowConfig
-        cfg = BowConfig(allowed_registries=["oci://ghcr.io/myorg"])
-        assert cfg.is_registry_allowed("oci://ghcr.io/myorg/charts")
-
-    def test_subpath_allowed(self):
-        from bow.oci.config import BowConfig
-        cfg = BowConfig(allowed_registries=["oci://ghcr.io/myorg"])
-        assert cfg.is_registry_allowed("oci://ghcr.io/myorg/sub/path")
-        assert not cfg.is_registry_allowed("oci://ghcr.io/other")
+        cfg = BowConfig(allowed_registries=allowed)
+        assert cfg.is_registry_allowed(url) is expected
 
 
 # ─────────────────────────────────────────────
 # FULL WORKFLOW: push → pull → install → discover
 # ─────────────────────────────────────────────
-class TestFullWorkflow:
-    def test_push_pull_install(self, tmp_path, monkeypatch):
-        """Tam akış: pack → push → pull → venv install → entry_points discovery."""
-        from bow.oci.client import pack_chart, push_chart, pull_chart, unpack_chart
-        from bow.oci.env import create_env, pip_install_in_env
+def _fake_pip_install(package_path, env):
+    """Stand-in for pip: copy the unpacked chart's src/ packages into the env's
+    site-packages, plus a dist-info carrying the pyproject entry points."""
+    import subprocess
+    import tomllib
+    package_path = Path(package_path)
+    for pkg in (package_path / "src").iterdir():
+        shutil.copytree(pkg, env.site_packages / pkg.name)
+
+    project = tomllib.loads((package_path / "pyproject.toml").read_text())["project"]
+    dist = f"{project['name'].replace('-', '_')}-{project['version']}"
+    dist_info = env.site_packages / f"{dist}.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        f"Metadata-Version: 2.1\nName: {project['name']}\nVersion: {project['version']}\n"
+    )
+    (dist_info / "entry_points.txt").write_text("".join(
+        f"[{group}]\n" + "".join(f"{k} = {v}\n" for k, v in eps.items())
+        for group, eps in project.get("entry-points", {}).items()
+    ))
+    return subprocess.CompletedProcess(["pip", "install", str(package_path)], 0, "", "")
+
+
+def _env_chart_entry_points(env):
+    """bow.charts entry points installed in the env's site-packages (name → value)."""
+    from importlib.metadata import distributions
+    return {
+        ep.name: ep.value
+        for dist in distributions(path=[str(env.site_packages)])
+        for ep in dist.entry_points
+        if ep.group == "bow.charts"
+    }
 
-        # 1. Chart oluştur
-        chart_dir = tmp_path / "bow-mini"
-        src_dir = chart_dir / "src" / "bow_mini"
-        src_dir.mkdir(parents=True)
 
-        with open(chart_dir / "chart.json", "w") as f:
-            json.dump({"name": "mini", "version": "0.1.0",
-                       "package_name": "bow-mini"}, f)
+class TestFullWorkflow:
+    @pytest.mark.parametrize("real_pip", [
+        False,
+        pytest.param(True, marks=pytest.mark.slow),
+    ], ids=["fake-pip", "real-pip"])
+    def test_push_pull_install(self, request, tmp_path, linked_chart, real_pip):
+        """Full flow: pack → push → pull → venv install → entry_points discovery.
+
+        By default the venv is hardlinked from the session template and pip is
+        faked; a real venv and pip install need --run-slow.
+        """
+        from bow.oci.env import create_env, pip_install_in_env
+        if not real_pip:
+            request.getfixturevalue("linked_venv")
 
-        (src_dir / "__init__.py").write_text(
-            'from bow.chart.base import Chart\n'
-            'class MiniChart(Chart):\n'
-            '    name = "mini"\n'
-            '    version = "0.1.0"\n'
-            '    def render(self, values): pass\n'
-        )
-        (src_dir / "defaults.yaml").write_text("x: 1\n")
-        (chart_dir / "pyproject.toml").write_text(
-            '[build-system]\nrequires = ["hatchling"]\n'
-            'build-backend = "hatchling.build"\n'
-            '[project]\nname = "bow-mini"\nversion = "0.1.0"\n'
-            'dependencies = []\n'
-            '[project.entry-points."bow.charts"]\n'
-            'mini = "bow_mini:MiniChart"\n'
-            '[tool.hatch.build.targets.wheel]\n'
-            'packages = ["src/bow_mini"]\n'
-        )
+        # 1. Create the chart
+        chart_dir = linked_chart(_MINI_FILES, "bow-mini", tmp_path)
 
-        # 2. Pack + Push
+        # 2. Pack + push
         artifact = pack_chart(chart_dir)
         registry_url = f"oci://{tmp_path / 'reg'}"
         push_chart(artifact, registry_url)
@@ -308,17 +604,19 @@ class TestFullWorkflow:
         env = create_env("test-wf")
         pulled = pull_chart("mini", "0.1.0", registry_url, env.cache_path)
         assert pulled.tar_path.exists()
+        assert pulled.digest == artifact.digest
 
         # 4. Unpack + install
         extract_dir = tmp_path / "extracted"
         unpack_chart(pulled.tar_path, extract_dir)
 
-        result = pip_install_in_env(str(extract_dir), env)
-        # pip install başarılı olmalı (veya zaten bow olmadan)
-        # Not: tam venv test'i CI ortamında daha güvenilir
+        install = pip_install_in_env if real_pip else _fake_pip_install
+        result = install(str(extract_dir), env)
+        assert result.returncode == 0, result.stderr
 
-        # 5. Artifact digest tutarlılığı
-        assert pulled.digest == artifact.digest
+        # 5. The chart is discoverable through the env's entry points
+        assert _env_chart_entry_points(env)["mini"] == "bow_mini:MiniChart"
+        assert (env.site_packages / "bow_mini" / "__init__.py").exists()
 
 
 # ─────────────────────────────────────────────
@@ -326,10 +624,6 @@ class TestFullWorkflow:
 # ─────────────────────────────────────────────
 class TestCLI:
     def test_env_create_and_list(self, tmp_path, monkeypatch):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        runner = CliRunner()
         result = runner.invoke(main, ["env", "create", "test-cli"])
         assert result.exit_code == 0
         assert "created" in result.output
@@ -339,10 +633,6 @@ class TestCLI:
         assert "test-cli" in result.output
 
     def test_registry_add_and_list(self, tmp_path, monkeypatch):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        runner = CliRunner()
         result = runner.invoke(main, [
             "registry", "add", "local", "oci://local", "--default",
         ])
@@ -353,41 +643,14 @@ class TestCLI:
         assert "local" in result.output
         assert "oci://local" in result.output
 
-    def test_push_and_pull(self, tmp_path, monkeypatch):
-        from click.testing import CliRunner
-        from bow.cli import main
-
+    def test_push_and_pull(self, tmp_path, linked_chart):
         # Setup: registry + env + chart
-        runner = CliRunner()
         reg_url = f"oci://{tmp_path / 'reg'}"
         runner.invoke(main, ["registry", "add", "test", reg_url, "--default"])
         runner.invoke(main, ["env", "create", "default"])
 
-        # Chart dir oluştur
-        chart_dir = tmp_path / "mychart"
-        src_dir = chart_dir / "src" / "bow_mychart"
-        src_dir.mkdir(parents=True)
-        with open(chart_dir / "chart.json", "w") as f:
-            json.dump({"name": "mychart", "version": "1.0.0",
-                       "package_name": "bow-mychart"}, f)
-        (src_dir / "__init__.py").write_text(
-            'from bow.chart.base import Chart\n'
-            'class MyChart(Chart):\n'
-            '    name = "mychart"\n'
-            '    version = "1.0.0"\n'
-            '    def render(self, values): pass\n'
-        )
-        (chart_dir / "pyproject.toml").write_text(
-            '[build-system]\nrequires = ["hatchling"]\n'
-            'build-backend = "hatchling.build"\n'
-            '[project]\nname = "bow-mychart"\nversion = "1.0.0"\n'
-            'dependencies = []\n'
-            '[project.entry-points."bow.charts"]\n'
-            'mychart = "bow_mychart:MyChart"\n'
-            '[tool.hatch.build.targets.wheel]\n'
-            'packages = ["src/bow_mychart"]\n'
-        )
-        (src_dir / "defaults.yaml").write_text("x: 1\n")
+        # Create the chart dir
+        chart_dir = linked_chart(_MYCHART_FILES, "mychart", tmp_path)
 
         # Push
         result = runner.invoke(main, ["push", str(chart_dir)])
@@ -399,107 +662,20 @@ class TestCLI:
         assert result.exit_code == 0, result.output
         assert "installed" in result.output
 
-    def test_install_local(self, tmp_path, monkeypatch):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        runner = CliRunner()
+    @pytest.mark.parametrize("files,dirname,extra_args,followup,expected", [
+        (_LOCALCHART_FILES, "bow-localchart", [], None, ["installed"]),
+        (_EDITCHART_FILES, "bow-editchart", ["-e"], None, ["editable", "installed"]),
+        (_RMCHART_FILES, "bow-rmchart", [], ["uninstall", "rmchart", "-y"], ["uninstalled"]),
+    ], ids=["local", "editable", "uninstall"])
+    def test_install(self, tmp_path, linked_chart, files, dirname, extra_args, followup, expected):
         runner.invoke(main, ["env", "create", "default"])
 
-        # Create a minimal chart dir
-        chart_dir = tmp_path / "bow-localchart"
-        src_dir = chart_dir / "src" / "bow_localchart"
-        src_dir.mkdir(parents=True)
-        (chart_dir / "pyproject.toml").write_text(
-            '[build-system]\nrequires = ["hatchling"]\n'
-            'build-backend = "hatchling.build"\n'
-            '[project]\nname = "bow-localchart"\nversion = "0.1.0"\n'
-            'dependencies = []\n'
-            '[project.entry-points."bow.charts"]\n'
-            'localchart = "bow_localchart:LocalChart"\n'
-            '[tool.hatch.build.targets.wheel]\n'
-            'packages = ["src/bow_localchart"]\n'
-        )
-        (src_dir / "__init__.py").write_text(
-            'from bow.chart.base import Chart\n'
-            'class LocalChart(Chart):\n'
-            '    name = "localchart"\n'
-            '    version = "0.1.0"\n'
-            '    def render(self, values): pass\n'
-        )
-        (src_dir / "defaults.yaml").write_text("x: 1\n")
-
-        result = runner.invoke(main, ["install", str(chart_dir)])
+        chart_dir = linked_chart(files, dirname, tmp_path)
+        result = runner.invoke(main, ["install", str(chart_dir), *extra_args])
         assert result.exit_code == 0, result.output
-        assert "installed" in result.output
-
-    def test_install_editable(self, tmp_path, monkeypatch):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        runner = CliRunner()
-        runner.invoke(main, ["env", "create", "default"])
-
-        chart_dir = tmp_path / "bow-editchart"
-        src_dir = chart_dir / "src" / "bow_editchart"
-        src_dir.mkdir(parents=True)
-        (chart_dir / "pyproject.toml").write_text(
-            '[build-system]\nrequires = ["hatchling"]\n'
-            'build-backend = "hatchling.build"\n'
-            '[project]\nname = "bow-editchart"\nversion = "0.1.0"\n'
-            'dependencies = []\n'
-            '[project.entry-points."bow.charts"]\n'
-            'editchart = "bow_editchart:EditChart"\n'
-            '[tool.hatch.build.targets.wheel]\n'
-            'packages = ["src/bow_editchart"]\n'
-        )
-        (src_dir / "__init__.py").write_text(
-            'from bow.chart.base import Chart\n'
-            'class EditChart(Chart):\n'
-            '    name = "editchart"\n'
-            '    version = "0.1.0"\n'
-            '    def render(self, values): pass\n'
-        )
-        (src_dir / "defaults.yaml").write_text("x: 1\n")
 
-        result = runner.invoke(main, ["install", str(chart_dir), "-e"])
-        assert result.exit_code == 0, result.output
-        assert "editable" in result.output
-        assert "installed" in result.output
-
-    def test_uninstall(self, tmp_path, monkeypatch):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        runner = CliRunner()
-        runner.invoke(main, ["env", "create", "default"])
-
-        # Install a chart first
-        chart_dir = tmp_path / "bow-rmchart"
-        src_dir = chart_dir / "src" / "bow_rmchart"
-        src_dir.mkdir(parents=True)
-        (chart_dir / "pyproject.toml").write_text(
-            '[build-system]\nrequires = ["hatchling"]\n'
-            'build-backend = "hatchling.build"\n'
-            '[project]\nname = "bow-rmchart"\nversion = "0.1.0"\n'
-            'dependencies = []\n'
-            '[project.entry-points."bow.charts"]\n'
-            'rmchart = "bow_rmchart:RmChart"\n'
-            '[tool.hatch.build.targets.wheel]\n'
-            'packages = ["src/bow_rmchart"]\n'
-        )
-        (src_dir / "__init__.py").write_text(
-            'from bow.chart.base import Chart\n'
-            'class RmChart(Chart):\n'
-            '    name = "rmchart"\n'
-            '    version = "0.1.0"\n'
-            '    def render(self, values): pass\n'
-        )
-        (src_dir / "defaults.yaml").write_text("x: 1\n")
-
-        runner.invoke(main, ["install", str(chart_dir)])
-
-        # Uninstall
-        result = runner.invoke(main, ["uninstall", "rmchart", "-y"])
-        assert result.exit_code == 0
-        assert "uninstalled" in result.output
\ No newline at end of file
+        if followup:
+            result = runner.invoke(main, followup)
+            assert result.exit_code == 0, result.output
+        for substr in expected:
+            assert substr in result.output
@@ -4,41 +4,46 @@ tests/test_stack.py — Stack system tests.
 Parser, merger, refs, engine and CLI stack mode.
 """
 
-import os
-import sys
-import yaml
+import itertools
+import json
+from functools import lru_cache
+
 import pytest
-import tempfile
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from click.testing import CliRunner
 
-from bow.core.stack import _reset
-from bow.chart.registry import register_chart, reset_registry
-from bow_postgresql import PostgreSQLChart
-from bow.stack.parser import parse_stack_file, parse_stack_dict, StackParseError
+from bow.cli import main
+from bow.chart.base import Chart
+from bow.chart.registry import register_chart
+from bow.core.resources import Deployment
+from bow.stack.parser import ComponentSpec, parse_stack_file, parse_stack_dict, StackParseError
 from bow.stack.refs import resolve_refs, RefError
 from bow.stack.merger import merge_stack_files, apply_set_to_stack
 from bow.stack.engine import render_stack, StackError
 
+from conftest import load_all_yaml, write_yaml_file
+
+
+runner = CliRunner()
+
 
-def _write_yaml(data, suffix=".yaml"):
-    f = tempfile.NamedTemporaryFile(mode="w", suffix=suffix, delete=False)
-    yaml.dump(data, f)
-    f.flush()
-    f.close()
-    return f.name
+pytestmark = pytest.mark.usefixtures("clean_charts")
 
 
-@pytest.fixture(autouse=True)
-def clean():
-    _reset()
-    reset_registry()
-    register_chart(PostgreSQLChart)
-    yield
-    _reset()
-    reset_registry()
+@pytest.fixture
+def write_yaml(tmp_path):
+    """write_yaml(data or YAML text) -> path of a new YAML file under tmp_path."""
+    names = itertools.count()
 
+    def _write(data, suffix=".yaml"):
+        path = tmp_path / f"stack-{next(names)}{suffix}"
+        write_yaml_file(path, data)
+        return str(path)
+    return _write
 
+
+# Shared by many tests and never mutated: derive variants with
+# dict(BASIC_STACK, key=...) (top-level swap) or copy.deepcopy.
 BASIC_STACK = {
     "apiVersion": "bow.io/v1",
     "kind": "Stack",
@@ -52,6 +57,36 @@ BASIC_STACK = {
     ],
 }
 
+# Serialized once; write_yaml and cached_render take the text as-is
+BASIC_STACK_YAML = json.dumps(BASIC_STACK)
+
+
+@pytest.fixture(scope="session")
+def basic_stack_path(tmp_path_factory):
+    """BASIC_STACK_YAML written once per session (read-only)."""
+    path = tmp_path_factory.mktemp("basic-stack") / "stack.yaml"
+    path.write_bytes(BASIC_STACK_YAML.encode())
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def cached_render(tmp_path_factory):
+    """cached_render(*yaml_texts, set_args=()) -> Manifest (read-only).
+
+    Keyed on the stack/overlay file contents, so tests rendering the same
+    input share one render_stack run. Callers must not mutate the result.
+    """
+    @lru_cache(maxsize=32)
+    def _render(*texts: str, set_args: tuple[str, ...] = ()):
+        root = tmp_path_factory.mktemp("stack")
+        paths = []
+        for i, text in enumerate(texts):
+            path = root / f"stack-{i}.yaml"
+            path.write_bytes(text.encode())
+            paths.append(str(path))
+        return render_stack(paths, set_args=list(set_args) or None)
+    return _render
+
 
 # ─────────────────────────────────────────────
 # PARSER
@@ -66,10 +101,8 @@ class TestParser:
         assert spec.components[0].name == "main-db"
         assert spec.components[0].values["storage"] == "50Gi"
 
-    def test_parse_file(self):
-        path = _write_yaml(BASIC_STACK)
-        spec = parse_stack_file(path)
-        os.unlink(path)
+    def test_parse_file(self, basic_stack_path):
+        spec = parse_stack_file(basic_stack_path)
         assert spec.name == "test-project"
 
     def test_name_defaults_to_chart(self):
@@ -82,12 +115,9 @@ class TestParser:
         spec = parse_stack_dict(data)
         assert spec.components[0].name == "postgresql"
 
-    def test_missing_name_raises(self):
-        with pytest.raises(StackParseError, match="metadata.name"):
-            parse_stack_dict({"metadata": {}})
-
-    def test_duplicate_name_raises(self):
-        data = {
+    @pytest.mark.parametrize("data,match", [
+        ({"metadata": {}}, "metadata.name"),
+        ({
             "apiVersion": "bow.io/v1",
             "kind": "Stack",
             "metadata": {"name": "proj"},
@@ -95,25 +125,12 @@ class TestParser:
                 {"chart": "postgresql", "name": "db"},
                 {"chart": "postgresql", "name": "db"},
             ],
-        }
-        with pytest.raises(StackParseError, match="Duplicate"):
-            parse_stack_dict(data)
-
-    def test_missing_chart_raises(self):
-        data = {
-            "metadata": {"name": "proj"},
-            "components": [{"name": "db"}],
-        }
-        with pytest.raises(StackParseError, match="chart is required"):
-            parse_stack_dict(data)
-
-    def test_wrong_api_version(self):
-        data = {
-            "apiVersion": "bow.io/v99",
-            "metadata": {"name": "proj"},
-            "components": [],
-        }
-        with pytest.raises(StackParseError, match="apiVersion"):
+        }, "Duplicate"),
+        ({"metadata": {"name": "proj"}, "components": [{"name": "db"}]}, "chart is required"),
+        ({"apiVersion": "bow.io/v99", "metadata": {"name": "proj"}, "components": []}, "apiVersion"),
+    ], ids=["missing-name", "duplicate-name", "missing-chart", "wrong-api-version"])
+    def test_parse_errors(self, data, match):
+        with pytest.raises(StackParseError, match=match):
             parse_stack_dict(data)
 
     def test_file_not_found(self):
@@ -126,7 +143,6 @@ class TestParser:
 # ─────────────────────────────────────────────
 class TestRefs:
     def test_host_ref(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={}),
             ComponentSpec(chart="myapp", name="api", values={
@@ -137,7 +153,6 @@ class TestRefs:
         assert resolved[1].values["database_host"] == "db"
 
     def test_port_ref(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={}),
             ComponentSpec(chart="myapp", name="api", values={
@@ -148,7 +163,6 @@ class TestRefs:
         assert resolved[1].values["database_port"] == "5432"
 
     def test_values_ref(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={"database": "myapp"}),
             ComponentSpec(chart="myapp", name="api", values={
@@ -159,7 +173,6 @@ class TestRefs:
         assert resolved[1].values["db_name"] == "myapp"
 
     def test_composite_ref(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={
                 "database": "myapp",
@@ -173,7 +186,6 @@ class TestRefs:
         assert resolved[1].values["url"] == "postgresql://db:5432/myapp"
 
     def test_nested_ref(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={}),
             ComponentSpec(chart="myapp", name="api", values={
@@ -185,7 +197,6 @@ class TestRefs:
         assert resolved[1].values["config"]["database"]["host"] == "db"
 
     def test_unknown_component_raises(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="myapp", name="api", values={
                 "host": "${nonexistent.host}",
@@ -195,7 +206,6 @@ class TestRefs:
             resolve_refs(components)
 
     def test_unknown_field_raises(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={}),
             ComponentSpec(chart="myapp", name="api", values={
@@ -206,7 +216,6 @@ class TestRefs:
             resolve_refs(components)
 
     def test_list_refs(self):
-        from bow.stack.parser import ComponentSpec
         components = [
             ComponentSpec(chart="postgresql", name="db", values={}),
             ComponentSpec(chart="myapp", name="api", values={
@@ -216,48 +225,53 @@ class TestRefs:
         resolved = resolve_refs(components)
         assert resolved[1].values["hosts"] == ["db", "other-host"]
 
+    def test_ref_free_subtrees_are_reused(self):
+        resources = {"limits": {"cpu": "1"}}
+        components = [
+            ComponentSpec(chart="postgresql", name="db", values={}),
+            ComponentSpec(chart="myapp", name="api", values={
+                "url": "${db.host}",
+                "resources": resources,
+            }),
+        ]
+        resolved = resolve_refs(components)
+        assert resolved[1].values["url"] == "db"
+        assert resolved[1].values["resources"] is resources
+
 
 # ─────────────────────────────────────────────
 # MERGER
 # ─────────────────────────────────────────────
 class TestMerger:
-    def test_single_file(self):
-        path = _write_yaml(BASIC_STACK)
-        result = merge_stack_files([path])
-        os.unlink(path)
+    def test_single_file(self, basic_stack_path):
+        result = merge_stack_files([basic_stack_path])
         assert result["metadata"]["name"] == "test-project"
 
-    def test_overlay_dict_format(self):
-        base_path = _write_yaml(BASIC_STACK)
+    def test_overlay_dict_format(self, write_yaml, basic_stack_path):
         overlay = {
             "components": {
                 "main-db": {"values": {"storage": "200Gi", "replicas": 5}},
             }
         }
-        overlay_path = _write_yaml(overlay)
+        overlay_path = write_yaml(overlay)
 
-        result = merge_stack_files([base_path, overlay_path])
-        os.unlink(base_path)
-        os.unlink(overlay_path)
+        result = merge_stack_files([basic_stack_path, overlay_path])
 
         comp = result["components"][0]
         assert comp["values"]["storage"] == "200Gi"
         assert comp["values"]["replicas"] == 5
         assert comp["name"] == "main-db"  # should be preserved
 
-    def test_overlay_list_format(self):
-        base_path = _write_yaml(BASIC_STACK)
+    def test_overlay_list_format(self, write_yaml, basic_stack_path):
         overlay = {
             "components": [
                 {"chart": "postgresql", "name": "main-db",
                  "values": {"replicas": 10}},
             ]
         }
-        overlay_path = _write_yaml(overlay)
+        overlay_path = write_yaml(overlay)
 
-        result = merge_stack_files([base_path, overlay_path])
-        os.unlink(base_path)
-        os.unlink(overlay_path)
+        result = merge_stack_files([basic_stack_path, overlay_path])
 
         comp = result["components"][0]
         assert comp["values"]["replicas"] == 10
@@ -265,96 +279,88 @@ class TestMerger:
 
     def test_set_override(self):
         result = apply_set_to_stack(
-            dict(BASIC_STACK),
+            BASIC_STACK,
             ["components.main-db.values.storage=500Gi"],
         )
         # --set deep merge
         assert "components" in result
+        # deep_merge copies; the shared constant must come through untouched
+        assert BASIC_STACK["components"][0]["values"]["storage"] == "50Gi"
 
-    def test_multiple_overlays(self):
-        base_path = _write_yaml(BASIC_STACK)
+    def test_multiple_overlays(self, write_yaml, basic_stack_path):
         overlay1 = {"components": {"main-db": {"values": {"replicas": 3}}}}
         overlay2 = {"components": {"main-db": {"values": {"replicas": 7}}}}
-        p1 = _write_yaml(overlay1)
-        p2 = _write_yaml(overlay2)
+        p1 = write_yaml(overlay1)
+        p2 = write_yaml(overlay2)
 
-        result = merge_stack_files([base_path, p1, p2])
-        os.unlink(base_path)
-        os.unlink(p1)
-        os.unlink(p2)
+        result = merge_stack_files([basic_stack_path, p1, p2])
 
         # Last overlay wins
         assert result["components"][0]["values"]["replicas"] == 7
 
+    def test_cached_reload_sees_edits_and_isolates_results(self, write_yaml):
+        path = write_yaml(BASIC_STACK_YAML)
+        first = merge_stack_files([path])
+        first["metadata"]["name"] = "mutated"
+        assert merge_stack_files([path])["metadata"]["name"] == "test-project"
+
+        edited = dict(BASIC_STACK, metadata={"name": "renamed-project"})
+        write_yaml_file(path, edited)
+        result = merge_stack_files([path])
+        assert result["metadata"]["name"] == "renamed-project"
+
 
 # ─────────────────────────────────────────────
 # ENGINE
 # ─────────────────────────────────────────────
-class TestEngine:
-    def test_render_basic_stack(self):
-        path = _write_yaml(BASIC_STACK)
-        m = render_stack([path])
-        os.unlink(path)
-
-        docs = m.to_dicts()
-        kinds = [d["kind"] for d in docs]
-        assert "Deployment" in kinds
-        assert "Service" in kinds
-        assert "PersistentVolumeClaim" in kinds
-
-        # Replicas override
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
-        assert dep["spec"]["replicas"] == 2
+@pytest.fixture
+def basic_manifest(cached_render):
+    """BASIC_STACK rendered once per session (read-only)."""
+    return cached_render(BASIC_STACK_YAML)
 
-        # Storage override
-        pvc = [d for d in docs if d["kind"] == "PersistentVolumeClaim"][0]
-        assert pvc["spec"]["resources"]["requests"]["storage"] == "50Gi"
 
-    def test_render_with_overlay(self):
-        base_path = _write_yaml(BASIC_STACK)
+class TestEngine:
+    @pytest.mark.parametrize("kind,path,expected", [
+        ("Deployment", ("spec", "replicas"), 2),
+        ("PersistentVolumeClaim",
+         ("spec", "resources", "requests", "storage"), "50Gi"),
+        ("Deployment", ("metadata", "labels", "bow.io/managed-by"), "bow"),
+        ("Deployment", ("metadata", "labels", "bow.io/chart"), "postgresql"),
+        ("Deployment", ("metadata", "labels", "bow.io/stack"), "test-project"),
+    ], ids=["replicas", "storage", "managed-by", "chart", "stack"])
+    def test_render_basic_stack(self, basic_manifest, by_kind, kind, path, expected):
+        kinds = by_kind(basic_manifest.to_dicts())
+        assert {"Deployment", "Service", "PersistentVolumeClaim"} <= kinds.keys()
+        node = kinds[kind][0]
+        for key in path:
+            node = node[key]
+        assert node == expected
+
+    def test_render_with_overlay(self, cached_render):
         overlay = {"components": {"main-db": {"values": {"replicas": 5}}}}
-        overlay_path = _write_yaml(overlay)
-
-        m = render_stack([base_path, overlay_path])
-        os.unlink(base_path)
-        os.unlink(overlay_path)
+        m = cached_render(BASIC_STACK_YAML, json.dumps(overlay))
 
         dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
         assert dep["spec"]["replicas"] == 5
 
-    def test_render_with_set(self):
-        path = _write_yaml(BASIC_STACK)
-        m = render_stack(
-            [path],
-            set_args=["components.main-db.values.replicas=9"],
+    def test_render_with_set(self, cached_render):
+        m = cached_render(
+            BASIC_STACK_YAML,
+            set_args=("components.main-db.values.replicas=9",),
         )
-        os.unlink(path)
 
         dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
         # Effect of --set on components depends on merge strategy
         # At minimum it should not error
         assert dep["kind"] == "Deployment"
 
-    def test_tracking_labels_with_stack(self):
-        path = _write_yaml(BASIC_STACK)
-        m = render_stack([path])
-        os.unlink(path)
-
-        dep = [d for d in m.to_dicts() if d["kind"] == "Deployment"][0]
-        labels = dep["metadata"]["labels"]
-        assert labels["bow.io/managed-by"] == "bow"
-        assert labels["bow.io/chart"] == "postgresql"
-        assert labels["bow.io/stack"] == "test-project"
-
-    def test_unknown_chart_raises(self):
-        data = dict(BASIC_STACK)
-        data["components"] = [{"chart": "nonexistent", "name": "x"}]
-        path = _write_yaml(data)
+    def test_unknown_chart_raises(self, write_yaml):
+        data = dict(BASIC_STACK, components=[{"chart": "nonexistent", "name": "x"}])
+        path = write_yaml(data)
         with pytest.raises(StackError, match="not found"):
             render_stack([path])
-        os.unlink(path)
 
-    def test_multi_component_stack(self):
+    def test_multi_component_stack(self, write_yaml):
         """Same chart twice, with different names."""
         data = {
             "apiVersion": "bow.io/v1",
@@ -367,21 +373,45 @@ class TestEngine:
                  "values": {"database": "analytics", "storage": "200Gi"}},
             ],
         }
-        path = _write_yaml(data)
+        path = write_yaml(data)
         m = render_stack([path])
-        os.unlink(path)
 
         docs = m.to_dicts()
         deployments = [d for d in docs if d["kind"] == "Deployment"]
         assert len(deployments) == 2
 
-    def test_yaml_output(self):
-        path = _write_yaml(BASIC_STACK)
+    def test_components_render_in_stack_order(self, write_yaml):
+        """Components render concurrently but output keeps stack order."""
+
+        class NamedChart(Chart):
+            name = "named"
+
+            def default_values(self):
+                return {}
+
+            def render(self, values):
+                Deployment(values["name"])
+
+        register_chart(NamedChart)
+        names = [f"app-{i}" for i in range(12)]
+        data = {
+            "apiVersion": "bow.io/v1",
+            "kind": "Stack",
+            "metadata": {"name": "ordered"},
+            "components": [
+                {"chart": "named", "name": n, "values": {"name": n}}
+                for n in names
+            ],
+        }
+        path = write_yaml(data)
         m = render_stack([path])
-        os.unlink(path)
 
-        yaml_str = m.to_yaml()
-        parsed = list(yaml.safe_load_all(yaml_str))
+        docs = m.to_dicts()
+        assert [d["metadata"]["name"] for d in docs] == names
+        assert all(d["metadata"]["labels"]["bow.io/stack"] == "ordered" for d in docs)
+
+    def test_yaml_output(self, basic_manifest):
+        parsed = list(load_all_yaml(basic_manifest.to_yaml()))
         assert len(parsed) >= 3
 
 
@@ -389,41 +419,24 @@ class TestEngine:
 # CLI STACK MODE
 # ─────────────────────────────────────────────
 class TestCLIStack:
-    def test_template_stack(self):
-        from click.testing import CliRunner
-        from bow.cli import main
+    @pytest.mark.parametrize("overlays,replicas", [
+        ([], 2),
+        ([{"components": {"main-db": {"values": {"replicas": 7}}}}], 7),
+    ], ids=["base", "overlay"])
+    def test_template_stack(self, write_yaml, basic_stack_path, overlays, replicas):
+        args = ["template", "-f", basic_stack_path]
+        for overlay in overlays:
+            args += ["-f", write_yaml(overlay)]
 
-        path = _write_yaml(BASIC_STACK)
-        runner = CliRunner()
-        result = runner.invoke(main, ["template", "-f", path])
-        os.unlink(path)
+        result = runner.invoke(main, args)
 
         assert result.exit_code == 0
         assert "kind: Deployment" in result.output
         assert "kind: Service" in result.output
-
-    def test_template_stack_with_overlay(self):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        base_path = _write_yaml(BASIC_STACK)
-        overlay = {"components": {"main-db": {"values": {"replicas": 7}}}}
-        overlay_path = _write_yaml(overlay)
-
-        runner = CliRunner()
-        result = runner.invoke(main, ["template", "-f", base_path, "-f", overlay_path])
-        os.unlink(base_path)
-        os.unlink(overlay_path)
-
-        assert result.exit_code == 0
-        docs = list(yaml.safe_load_all(result.output))
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
-        assert dep["spec"]["replicas"] == 7
+        # Lazy multi-doc parse: stops at the first Deployment
+        dep = next(d for d in load_all_yaml(result.output) if d["kind"] == "Deployment")
+        assert dep["spec"]["replicas"] == replicas
 
     def test_template_no_args(self):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        runner = CliRunner()
         result = runner.invoke(main, ["template"])
         assert result.exit_code != 0
@@ -5,58 +5,59 @@ Lock parse/write, stage resolver, checksum/drift,
 workspace resolver, CLI workspace mode.
 """
 
+import hashlib
+import json
 import os
-import sys
-import yaml
+
 import pytest
-import tempfile
-import shutil
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from click.testing import CliRunner
 
-from bow.core.stack import _reset
-from bow.chart.registry import register_chart, reset_registry
-from bow_postgresql import PostgreSQLChart
-from bow_redis import RedisChart
-from bow_redmine import RedmineChart
+from bow.cli import main
 from bow.workspace.lock import (
     LockSpec, parse_lock, write_lock, compute_checksum, check_drift, LockError,
 )
+import bow.workspace.lock as lock_mod
 from bow.workspace.stage import resolve_stages, resolve_value_files
 from bow.workspace.resolver import resolve_workspace, WorkspaceError
 
+from conftest import load_all_yaml, write_yaml_file
 
-@pytest.fixture(autouse=True)
-def clean():
-    _reset()
-    reset_registry()
-    register_chart(PostgreSQLChart)
-    register_chart(RedisChart)
-    register_chart(RedmineChart)
-    yield
-    _reset()
-    reset_registry()
 
+runner = CliRunner()
 
-def _make_workspace(files: dict[str, str | dict]) -> str:
-    """Create a temporary workspace directory."""
-    tmpdir = tempfile.mkdtemp()
-    for name, content in files.items():
-        path = os.path.join(tmpdir, name)
-        with open(path, "w") as f:
-            if isinstance(content, dict):
-                yaml.dump(content, f)
-            else:
-                f.write(content)
-    return tmpdir
+
+pytestmark = pytest.mark.usefixtures("clean_charts")
+
+
+# Stack file shared by the stack-mode workspace tests, serialized once
+_STACK_YAML = json.dumps({
+    "apiVersion": "bow.io/v1",
+    "kind": "Stack",
+    "metadata": {"name": "test", "namespace": "t3"},
+    "components": [
+        {"chart": "postgresql", "name": "db",
+         "values": {"storage": "50Gi"}},
+    ],
+})
+
+
+@pytest.fixture
+def make_workspace(tmp_path):
+    """make_workspace(files) -> workspace dir (tmp_path) holding files."""
+    def _make(files: dict[str, str | dict]) -> str:
+        for name, content in files.items():
+            write_yaml_file(tmp_path / name, content)
+        return str(tmp_path)
+    return _make
 
 
 # ─────────────────────────────────────────────
 # LOCK
 # ─────────────────────────────────────────────
 class TestLock:
-    def test_parse_chart_lock(self):
-        ws = _make_workspace({
+    def test_parse_chart_lock(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nversion: '16.4.0'\nnamespace: t1\n",
         })
         lock = parse_lock(os.path.join(ws, "bow.lock"))
@@ -64,39 +65,35 @@ class TestLock:
         assert lock.version == "16.4.0"
         assert lock.namespace == "t1"
         assert not lock.is_stack
-        shutil.rmtree(ws)
 
-    def test_parse_stack_lock(self):
-        ws = _make_workspace({
+    def test_parse_stack_lock(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "stack: stack.yaml\nnamespace: t3\n",
         })
         lock = parse_lock(os.path.join(ws, "bow.lock"))
         assert lock.stack == "stack.yaml"
         assert lock.is_stack
-        shutil.rmtree(ws)
 
     def test_parse_missing_raises(self):
         with pytest.raises(LockError, match="not found"):
             parse_lock("/nonexistent/bow.lock")
 
-    def test_parse_no_chart_no_stack_raises(self):
-        ws = _make_workspace({
+    def test_parse_no_chart_no_stack_raises(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "namespace: t1\n",
         })
         with pytest.raises(LockError, match="either"):
             parse_lock(os.path.join(ws, "bow.lock"))
-        shutil.rmtree(ws)
 
-    def test_parse_both_raises(self):
-        ws = _make_workspace({
+    def test_parse_both_raises(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nstack: stack.yaml\n",
         })
         with pytest.raises(LockError, match="both"):
             parse_lock(os.path.join(ws, "bow.lock"))
-        shutil.rmtree(ws)
 
-    def test_write_and_read(self):
-        ws = _make_workspace({})
+    def test_write_and_read(self, make_workspace):
+        ws = make_workspace({})
         lock_path = os.path.join(ws, "bow.lock")
         lock = LockSpec(
             chart="postgresql", version="16.4.0",
@@ -107,7 +104,17 @@ class TestLock:
         assert parsed.chart == "postgresql"
         assert parsed.version == "16.4.0"
         assert parsed.checksum == "sha256:abc123"
-        shutil.rmtree(ws)
+
+    def test_rewrite_within_one_mtime_tick(self, make_workspace):
+        ws = make_workspace({})
+        lock_path = os.path.join(ws, "bow.lock")
+        write_lock(LockSpec(chart="pg", version="1.0"), lock_path)
+        st = os.stat(lock_path)
+        assert parse_lock(lock_path).version == "1.0"
+
+        write_lock(LockSpec(chart="pg", version="2.0"), lock_path)
+        os.utime(lock_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert parse_lock(lock_path).version == "2.0"
 
     def test_display_name(self):
         assert LockSpec(chart="pg", version="1.0").display_name == "pg@1.0"
@@ -118,113 +125,161 @@ class TestLock:
 # ─────────────────────────────────────────────
 # CHECKSUM & DRIFT
 # ─────────────────────────────────────────────
-class TestChecksum:
-    def test_checksum_deterministic(self):
-        ws = _make_workspace({
-            "values.yaml": "replicas: 1\n",
-        })
-        c1 = compute_checksum(ws)
-        c2 = compute_checksum(ws)
-        assert c1 == c2
-        assert c1.startswith("sha256:")
-        shutil.rmtree(ws)
-
-    def test_checksum_changes_on_content(self):
-        ws = _make_workspace({
-            "values.yaml": "replicas: 1\n",
-        })
-        c1 = compute_checksum(ws)
-        with open(os.path.join(ws, "values.yaml"), "w") as f:
-            f.write("replicas: 5\n")
-        c2 = compute_checksum(ws)
-        assert c1 != c2
-        shutil.rmtree(ws)
+# Baseline workspace for the checksum tests; mutations are built on a copy
+_BASE_WS = {"values.yaml": "replicas: 1\n"}
 
-    def test_checksum_includes_stage_files(self):
-        ws = _make_workspace({
-            "values.yaml": "replicas: 1\n",
-        })
-        c1 = compute_checksum(ws)
-        with open(os.path.join(ws, "values.prod.yaml"), "w") as f:
-            f.write("replicas: 5\n")
-        c2 = compute_checksum(ws)
-        assert c1 != c2
-        shutil.rmtree(ws)
-
-    def test_drift_detected(self):
-        ws = _make_workspace({
-            "values.yaml": "replicas: 1\n",
-        })
-        checksum = compute_checksum(ws)
-        lock = LockSpec(chart="pg", checksum=checksum)
+
+@pytest.fixture(scope="class")
+def base_checksum(tmp_path_factory):
+    """compute_checksum of _BASE_WS, once per class.
+
+    The checksum covers file names and contents only, so it holds for any
+    directory written from _BASE_WS.
+    """
+    ws = tmp_path_factory.mktemp("ws-base")
+    for name, content in _BASE_WS.items():
+        write_yaml_file(ws / name, content)
+    return compute_checksum(ws)
+
+
+class TestChecksum:
+    def test_checksum_deterministic(self, make_workspace, base_checksum):
+        ws = make_workspace(_BASE_WS)
+        assert compute_checksum(ws) == base_checksum
+        assert base_checksum.startswith("sha256:")
+
+    @pytest.mark.parametrize("name,content", [
+        ("values.yaml", "replicas: 5\n"),
+        ("values.prod.yaml", "replicas: 5\n"),
+    ], ids=["content", "stage-file"])
+    def test_checksum_changes(self, make_workspace, base_checksum, name, content):
+        ws = make_workspace({**_BASE_WS, name: content})
+        assert compute_checksum(ws) != base_checksum
+
+    def test_drift_detected(self, make_workspace, base_checksum):
+        ws = make_workspace(_BASE_WS)
+        lock = LockSpec(chart="pg", checksum=base_checksum)
         assert not check_drift(ws, lock)
 
         # Modify
         with open(os.path.join(ws, "values.yaml"), "w") as f:
             f.write("replicas: 99\n")
         assert check_drift(ws, lock)
-        shutil.rmtree(ws)
 
-    def test_no_drift_without_checksum(self):
-        ws = _make_workspace({
+    def test_checksum_cache_rehashes_only_changed_files(self, make_workspace, monkeypatch):
+        ws = make_workspace({**_BASE_WS, "stack.yaml": "components: []\n"})
+        cache = {}
+        first = compute_checksum(ws, cache=cache)
+        assert first == compute_checksum(ws)
+        assert len(cache) == 2
+
+        path = os.path.join(ws, "values.yaml")
+        st = os.stat(path)
+        with open(path, "w") as f:
+            f.write("replicas: 99\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        hashed = []
+        real_hash_file = lock_mod._hash_file
+
+        def _spy(fp):
+            hashed.append(fp.name)
+            return real_hash_file(fp)
+        monkeypatch.setattr(lock_mod, "_hash_file", _spy)
+        second = compute_checksum(ws, cache=cache)
+        assert hashed == ["values.yaml"]
+        assert second != first
+        assert second == compute_checksum(ws)
+
+    def test_stat_sidecar_does_not_hide_same_size_edit(self, make_workspace, base_checksum):
+        ws = make_workspace(_BASE_WS)
+        lock = LockSpec(chart="pg", checksum=base_checksum)
+        write_lock(lock, os.path.join(ws, "bow.lock"))
+        assert not check_drift(ws, lock)
+        assert os.path.exists(os.path.join(ws, "bow.lock.stat"))
+
+        path = os.path.join(ws, "values.yaml")
+        st = os.stat(path)
+        with open(path, "w") as f:
+            f.write("replicas: 2\n")
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert check_drift(ws, lock)
+
+    def test_write_lock_does_not_vouch_for_stale_checksum(self, make_workspace):
+        ws = make_workspace(_BASE_WS)
+        lock = LockSpec(chart="pg", checksum="sha256:stale")
+        write_lock(lock, os.path.join(ws, "bow.lock"))
+        assert not os.path.exists(os.path.join(ws, "bow.lock.stat"))
+        assert check_drift(ws, lock)
+        assert check_drift(ws, lock)  # and still drifted on the next check
+
+    def test_no_drift_for_legacy_checksum(self, make_workspace):
+        """Locks written with the old single-stream checksum stay clean."""
+        ws = make_workspace({
+            "stack.yaml": "components: []\n",
             "values.yaml": "replicas: 1\n",
         })
+        hasher = hashlib.sha256()
+        for name in ("stack.yaml", "values.yaml"):
+            hasher.update(name.encode())
+            with open(os.path.join(ws, name), "rb") as f:
+                hasher.update(f.read())
+        lock = LockSpec(chart="pg", checksum=f"sha256:{hasher.hexdigest()}")
+        assert not check_drift(ws, lock)
+
+    def test_no_drift_without_checksum(self, make_workspace):
+        ws = make_workspace(_BASE_WS)
         lock = LockSpec(chart="pg")  # no checksum
         assert not check_drift(ws, lock)
-        shutil.rmtree(ws)
 
 
 # ─────────────────────────────────────────────
 # STAGE
 # ─────────────────────────────────────────────
 class TestStage:
-    def test_flag_priority(self):
-        os.environ["KUBRIC_STAGE"] = "staging"
+    def test_flag_priority(self, monkeypatch):
+        monkeypatch.setenv("KUBRIC_STAGE", "staging")
         assert resolve_stages(["prod"]) == ["prod"]
-        del os.environ["KUBRIC_STAGE"]
 
-    def test_env_fallback(self):
-        os.environ["KUBRIC_STAGE"] = "prod"
+    def test_env_fallback(self, monkeypatch):
+        monkeypatch.setenv("KUBRIC_STAGE", "prod")
         assert resolve_stages() == ["prod"]
-        del os.environ["KUBRIC_STAGE"]
 
-    def test_env_comma(self):
-        os.environ["KUBRIC_STAGE"] = "prod,eu-west"
+    def test_env_comma(self, monkeypatch):
+        monkeypatch.setenv("KUBRIC_STAGE", "prod,eu-west")
         assert resolve_stages() == ["prod", "eu-west"]
-        del os.environ["KUBRIC_STAGE"]
 
-    def test_no_stage(self):
+    def test_no_stage(self, monkeypatch):
+        monkeypatch.delenv("KUBRIC_STAGE", raising=False)
         assert resolve_stages() == []
 
-    def test_resolve_value_files(self):
-        ws = _make_workspace({
+    def test_resolve_value_files(self, make_workspace):
+        ws = make_workspace({
             "values.yaml": "a: 1\n",
             "values.prod.yaml": "b: 2\n",
             "values.staging.yaml": "c: 3\n",
         })
         files = resolve_value_files(ws, ["prod"])
         assert len(files) == 2
-        assert files[0].endswith("values.yaml")
-        assert files[1].endswith("values.prod.yaml")
-        shutil.rmtree(ws)
+        assert files[0].name == "values.yaml"
+        assert files[1].name == "values.prod.yaml"
 
-    def test_resolve_multiple_stages(self):
-        ws = _make_workspace({
+    def test_resolve_multiple_stages(self, make_workspace):
+        ws = make_workspace({
             "values.yaml": "a: 1\n",
             "values.prod.yaml": "b: 2\n",
             "values.eu.yaml": "c: 3\n",
         })
         files = resolve_value_files(ws, ["prod", "eu"])
         assert len(files) == 3
-        shutil.rmtree(ws)
 
 
 # ─────────────────────────────────────────────
 # WORKSPACE RESOLVER
 # ─────────────────────────────────────────────
 class TestResolver:
-    def test_chart_workspace(self):
-        ws = _make_workspace({
+    def test_chart_workspace(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nversion: '16.4.0'\nnamespace: t1\n",
             "values.yaml": "replicas: 2\nstorage: 50Gi\n",
         })
@@ -233,10 +288,9 @@ class TestResolver:
         assert plan.namespace == "t1"
         assert not plan.is_stack
         assert len(plan.files) == 1
-        shutil.rmtree(ws)
 
-    def test_chart_workspace_with_stage(self):
-        ws = _make_workspace({
+    def test_chart_workspace_with_stage(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nversion: '16.4.0'\nnamespace: t1\n",
             "values.yaml": "replicas: 1\n",
             "values.prod.yaml": "replicas: 5\n",
@@ -244,150 +298,117 @@ class TestResolver:
         plan = resolve_workspace(ws, stage_flags=["prod"])
         assert plan.stages == ["prod"]
         assert len(plan.files) == 2
-        shutil.rmtree(ws)
 
-    def test_stack_workspace(self):
-        ws = _make_workspace({
+    def test_stack_workspace(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "stack: stack.yaml\nnamespace: t3\n",
-            "stack.yaml": yaml.dump({
-                "apiVersion": "bow.io/v1",
-                "kind": "Stack",
-                "metadata": {"name": "test", "namespace": "t3"},
-                "components": [{"chart": "postgresql", "name": "db"}],
-            }),
+            "stack.yaml": _STACK_YAML,
         })
         plan = resolve_workspace(ws)
         assert plan.is_stack
-        assert any("stack.yaml" in f for f in plan.files)
-        shutil.rmtree(ws)
+        assert any(f.name == "stack.yaml" for f in plan.files)
 
-    def test_no_lock_raises(self):
-        ws = _make_workspace({"values.yaml": "a: 1\n"})
+    def test_no_lock_raises(self, make_workspace):
+        ws = make_workspace({"values.yaml": "a: 1\n"})
         with pytest.raises(WorkspaceError, match="not found"):
             resolve_workspace(ws)
-        shutil.rmtree(ws)
 
-    def test_drift_flag(self):
-        ws = _make_workspace({
+    def test_drift_flag(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nchecksum: sha256:old\n",
             "values.yaml": "replicas: 1\n",
         })
         plan = resolve_workspace(ws)
         assert plan.has_drift  # checksum mismatch
-        shutil.rmtree(ws)
 
 
 # ─────────────────────────────────────────────
 # CLI WORKSPACE MODE
 # ─────────────────────────────────────────────
 class TestCLIWorkspace:
-    def test_template_workspace(self):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        ws = _make_workspace({
+    def test_template_workspace(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nversion: '16.4.0'\nnamespace: t1\n",
             "values.yaml": "replicas: 2\nstorage: 50Gi\n",
         })
 
-        runner = CliRunner()
         result = runner.invoke(main, ["template", "-C", ws])
         assert result.exit_code == 0
         assert "kind: Deployment" in result.output
 
-        docs = list(yaml.safe_load_all(result.output))
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
+        # Lazy multi-doc parse: stops at the first Deployment
+        dep = next(d for d in load_all_yaml(result.output) if d["kind"] == "Deployment")
         assert dep["spec"]["replicas"] == 2
-        shutil.rmtree(ws)
-
-    def test_template_workspace_with_stage(self):
-        from click.testing import CliRunner
-        from bow.cli import main
 
-        ws = _make_workspace({
+    def test_template_workspace_with_stage(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nnamespace: t1\n",
             "values.yaml": "replicas: 1\nstorage: 10Gi\n",
             "values.prod.yaml": "replicas: 5\nstorage: 200Gi\n",
         })
 
-        runner = CliRunner()
         result = runner.invoke(main, ["template", "-C", ws, "--stage", "prod"])
         assert result.exit_code == 0
 
-        docs = list(yaml.safe_load_all(result.output))
-        dep = [d for d in docs if d["kind"] == "Deployment"][0]
+        # Lazy multi-doc parse: stops at the first Deployment
+        dep = next(d for d in load_all_yaml(result.output) if d["kind"] == "Deployment")
         assert dep["spec"]["replicas"] == 5
-        shutil.rmtree(ws)
 
-    def test_template_workspace_stack(self):
-        from click.testing import CliRunner
-        from bow.cli import main
-
-        ws = _make_workspace({
+    def test_template_workspace_stack(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "stack: stack.yaml\nnamespace: t3\n",
-            "stack.yaml": yaml.dump({
-                "apiVersion": "bow.io/v1",
-                "kind": "Stack",
-                "metadata": {"name": "test", "namespace": "t3"},
-                "components": [
-                    {"chart": "postgresql", "name": "db",
-                     "values": {"storage": "50Gi"}},
-                ],
-            }),
+            "stack.yaml": _STACK_YAML,
         })
 
-        runner = CliRunner()
         result = runner.invoke(main, ["template", "-C", ws])
         assert result.exit_code == 0
         assert "kind: Deployment" in result.output
-        shutil.rmtree(ws)
-
-    def test_status_clean(self):
-        from click.testing import CliRunner
-        from bow.cli import main
 
-        ws = _make_workspace({
+    def test_status_clean(self, make_workspace):
+        ws = make_workspace({
             "values.yaml": "replicas: 1\n",
         })
         checksum = compute_checksum(ws)
-        with open(os.path.join(ws, "bow.lock"), "w") as f:
-            yaml.dump({
-                "chart": "postgresql",
-                "version": "16.4.0",
-                "namespace": "t1",
-                "checksum": checksum,
-            }, f)
-
-        runner = CliRunner()
+        write_yaml_file(os.path.join(ws, "bow.lock"), {
+            "chart": "postgresql",
+            "version": "16.4.0",
+            "namespace": "t1",
+            "checksum": checksum,
+        })
+
         result = runner.invoke(main, ["status", "-C", ws])
         assert result.exit_code == 0
         assert "No drift" in result.output
-        shutil.rmtree(ws)
-
-    def test_status_drift(self):
-        from click.testing import CliRunner
-        from bow.cli import main
 
-        ws = _make_workspace({
+    def test_status_drift(self, make_workspace):
+        ws = make_workspace({
             "bow.lock": "chart: postgresql\nchecksum: sha256:stale\n",
             "values.yaml": "replicas: 1\n",
         })
 
-        runner = CliRunner()
         result = runner.invoke(main, ["status", "-C", ws])
         assert result.exit_code == 0
         assert "DRIFT" in result.output
-        shutil.rmtree(ws)
+        assert f"current: {compute_checksum(ws)}" in result.output
+
+    def test_status_clean_from_sidecar_skips_hashing(self, make_workspace, monkeypatch):
+        ws = make_workspace(_BASE_WS)
+        lock = LockSpec(chart="postgresql", checksum=compute_checksum(ws))
+        write_lock(lock, os.path.join(ws, "bow.lock"))
+        assert not check_drift(ws, lock)  # verifies and records the sidecar
 
-    def test_lock_init_and_update(self):
-        from click.testing import CliRunner
-        from bow.cli import main
+        def _no_hash(fp):
+            raise AssertionError(f"hashed {fp.name}")
+        monkeypatch.setattr(lock_mod, "_hash_file", _no_hash)
+        result = runner.invoke(main, ["status", "-C", ws])
+        assert result.exit_code == 0
+        assert "No drift" in result.output
 
-        ws = _make_workspace({
+    def test_lock_init_and_update(self, make_workspace):
+        ws = make_workspace({
             "values.yaml": "replicas: 1\n",
         })
 
-        runner = CliRunner()
         # Init
         result = runner.invoke(main, [
             "lock", "--init", "postgresql", "-n", "t1", "-C", ws,
@@ -409,4 +430,3 @@ class TestCLIWorkspace:
         assert result.exit_code == 0
         assert "updated" in result.output
 
-        shutil.rmtree(ws)